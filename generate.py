@@ -0,0 +1,115 @@
+"""
+generates puzzles in bulk into a corpus file without opening a window
+
+    python generate.py --count 100000 --out data/corpus/puzzles.bin
+
+every chunk of puzzles gets its own seed made from --seed and the chunk number and
+the search is bounded by --max-states instead of time, so the same arguments give
+the same file no matter how many workers run, chunks are appended in order as soon
+as they are done
+
+a puzzle the search could not take --min-distance moves from its solution is thrown
+away and another one is made, generator.generate only falls back to the farthest board
+so the game always has a puzzle, so is one whose distance --verify does not agree with
+"""
+
+from typing import List, Dict, Tuple
+
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import src.config as cfg
+import src.corpus as corpus
+import src.generator as generator
+import src.solver as solver
+
+import numpy as np
+
+from pathlib import Path
+import multiprocessing
+import argparse
+import random
+import time
+
+
+# how many puzzles may be thrown away for every one kept before the chunk gives up
+MAX_REJECTED_PER_PUZZLE: int = 100
+
+
+def generate_chunk(task: Tuple[int, int, int, int, int, int, bool]) -> Tuple[int, np.ndarray, int, float, int]:
+    chunk, size, seed, min_distance, max_distance, max_states, verify = task
+    random.seed(seed * 1_000_003 + chunk)
+    start_time = time.perf_counter()
+
+    records = np.empty(size, dtype=corpus.record_dtype())
+    count = short = wrong = 0
+    while count < size:
+        if short + wrong > MAX_REJECTED_PER_PUZZLE * size:
+            raise RuntimeError(f"chunk {chunk} threw away {short} puzzles shorter than {min_distance} moves and "
+                               f"{wrong} whose distance did not verify, it kept {count}, --max-states {max_states} "
+                               f"is too low to reach the distance or the generator is wrong")
+        puzzle = generator.generate(
+            generator.gen_random_counts(),
+            min_distance,
+            max_distance,
+            time_budget=float("inf"),
+            max_states=max_states,
+        )
+        if puzzle.distance < min_distance:
+            short += 1
+            continue
+        if verify and solver.distance(puzzle.start, puzzle.solution) != puzzle.distance:
+            wrong += 1
+            continue
+        records[count] = (puzzle.start, puzzle.solution, puzzle.distance)
+        count += 1
+
+    return chunk, records, os.getpid(), time.perf_counter() - start_time, short + wrong
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="generate puzzles into a corpus file")
+    parser.add_argument("--count", type=int, default=10_000, help="how many puzzles to add")
+    parser.add_argument("--out", type=Path, default=cfg.Paths.DATA / "corpus" / "puzzles.bin")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=64, help="puzzles per task and per write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-distance", type=int, default=cfg.MIN_SOLUTION_DISTANCE)
+    parser.add_argument("--max-distance", type=int, default=cfg.MAX_SOLUTION_DISTANCE)
+    parser.add_argument("--max-states", type=int, default=20_000, help="boards the search may find per puzzle")
+    parser.add_argument("--verify", action="store_true", help="solve every puzzle again before keeping it")
+    args = parser.parse_args()
+
+    tasks = []
+    for chunk, first in enumerate(range(0, args.count, args.chunk)):
+        size = min(args.chunk, args.count - first)
+        tasks.append((chunk, size, args.seed, args.min_distance, args.max_distance, args.max_states, args.verify))
+
+    # pid -> (puzzles, seconds spent on them)
+    workers: Dict[int, List[float]] = {}
+    written = rejected = 0
+    start_time = time.perf_counter()
+
+    with corpus.CorpusWriter(args.out) as writer, multiprocessing.Pool(args.workers) as pool:
+        for chunk, records, pid, elapsed, chunk_rejected in pool.imap(generate_chunk, tasks):
+            writer.write_records(records)
+            written += len(records)
+            rejected += chunk_rejected
+
+            stats = workers.setdefault(pid, [0, 0.0])
+            stats[0] += len(records)
+            stats[1] += elapsed
+
+            total_time = time.perf_counter() - start_time
+            print(f"\r{written}/{args.count} puzzles, {written / total_time:.1f}/s", end="", flush=True)
+
+    print()
+    for i, (pid, (puzzles, elapsed)) in enumerate(sorted(workers.items())):
+        print(f"worker {i} (pid {pid}): {int(puzzles)} puzzles, {puzzles / elapsed:.1f}/s")
+    print(f"wrote {written} puzzles to {args.out} in {time.perf_counter() - start_time:.1f}s, "
+          f"threw away {rejected} shorter than {args.min_distance} moves or failing --verify")
+
+
+if __name__ == "__main__":
+    main()
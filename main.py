@@ -1,10 +1,16 @@
 import pygame
+import argparse
 import src.config as cfg
 from src.game import Game
 import src.grid as grid
 
 
 def main():
+    parser = argparse.ArgumentParser(description="play shifty")
+    parser.add_argument("--record", action="store_true", help=f"write a journal of every puzzle to {cfg.Paths.JOURNALS}")
+    args = parser.parse_args()
+    cfg.RECORD_JOURNALS = args.record
+
     pygame.init()
 
     game = Game(cfg.get_main_surface())
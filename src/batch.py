@@ -0,0 +1,263 @@
+"""
+many boards of the same size in one (N, rows, cols) np.uint8 array
+
+moves follow Grid.move, a block is found from any of its cells and moves one cell
+when every cell it moves into is free, but every step is a whole array operation
+so the time goes to numpy instead of a Grid and its method calls per board
+
+the shapes are shifted over the boards instead of looked at cell by cell, a board
+with a block of type t anchored at row-col covers row+d_row-col+d_col for every cell
+of its shape, so the cells covered by type t are the boards == t shifted by each of
+them, the shifts are done on a copy padded with a border wide enough for every shape
+
+run it with
+    python -m src.batch
+to compare it with a Grid per board
+"""
+
+from typing import Dict, Optional, Union, Iterable, Tuple
+
+import src.config as cfg
+import src.grid as grid
+import src.bitboard as bitboard
+import src.generator as generator
+
+import numpy as np
+
+import argparse
+import random
+import time
+
+
+IntOrArray = Union[int, np.ndarray]
+
+
+class BoardBatch:
+    def __init__(self, boards: np.ndarray, types: Optional[Iterable[int]]=None) -> None:
+        """
+        :param boards: (N, rows, cols), used as is when it is already np.uint8
+        :param types: the Blocks.BLOCK_* the boards can hold, the classic ones and every one found when None
+        """
+        self.boards: np.ndarray = np.asarray(boards, dtype=np.uint8)
+        assert self.boards.ndim == 3, f"boards shape {self.boards.shape} is not (N, rows, cols)"
+        _, self.rows, self.cols = self.boards.shape
+
+        if types is None:
+            types = grid.Blocks.types_for(np.unique(self.boards).tolist())
+        self.types: Tuple[int, ...] = tuple(sorted(types))
+        self.tables: bitboard.Tables = bitboard.get_tables(self.rows, self.cols, self.types)
+        self._cover, self._probes = grid.shape_tables(self.types)
+
+        # wide enough that every shape and every cell it moves into fits in it from any anchor
+        self._border: int = 1 + max(
+            abs(offset)
+            for typ, d_row, d_col in self._cover
+            for offset in (d_row, d_col)
+        )
+
+    @staticmethod
+    def from_boards(boards: Iterable[Union[grid.Grid, bitboard.BitGrid, np.ndarray]], types: Optional[Iterable[int]]=None) -> "BoardBatch":
+        return BoardBatch(np.stack([
+            board.get_grid() if isinstance(board, (grid.Grid, bitboard.BitGrid)) else np.asarray(board, dtype=np.uint8)
+            for board in boards
+        ]), types)
+
+    def __len__(self) -> int:
+        return len(self.boards)
+
+    def copy(self) -> "BoardBatch":
+        return BoardBatch(self.boards.copy(), self.types)
+
+    def to_grid(self, index: int) -> grid.Grid:
+        board = grid.Grid(self.rows, self.cols, self.types)
+        board.set(self.boards[index])
+        return board
+
+    def _by_cell(self) -> np.ndarray:
+        """
+        :return: the boards as (rows, cols, N), so every shifted cell is a run of N values
+                 instead of a few values from every board
+        """
+        return np.ascontiguousarray(np.moveaxis(self.boards, 0, -1))
+
+    def _padded(self, array: np.ndarray) -> np.ndarray:
+        border = self._border
+        return np.pad(array, ((border, border), (border, border), (0, 0)))
+
+    def _shifted(self, padded: np.ndarray, d_row: int, d_col: int) -> np.ndarray:
+        """
+        :return: the (rows, cols, N) view where row-col holds padded at row+d_row-col+d_col
+        """
+        row, col = self._border + d_row, self._border + d_col
+        return padded[row:row + self.rows, col:col + self.cols]
+
+    def _anchors(self, cells: np.ndarray) -> Dict[int, np.ndarray]:
+        """
+        :param cells: self._by_cell()
+        :return: typ -> (rows, cols, N) bool where a block of it has its topleft, for the types on any board
+        """
+        anchors = {}
+        for typ in self.types:
+            is_typ = cells == typ
+            if is_typ.any():
+                anchors[typ] = is_typ
+        return anchors
+
+    def _free(self, anchors: Dict[int, np.ndarray]) -> np.ndarray:
+        """
+        :return: (rows, cols, N) bool padded with the border, the cells no block covers,
+                 off the board counts as taken
+        """
+        border = self._border
+        covered = np.zeros((self.rows + 2 * border, self.cols + 2 * border, len(self)), dtype=bool)
+        for typ, d_row, d_col in self._cover:
+            if typ in anchors:
+                self._shifted(covered, d_row, d_col)[...] |= anchors[typ]
+        free = np.zeros_like(covered)
+        self._shifted(free, 0, 0)[...] = ~self._shifted(covered, 0, 0)
+        return free
+
+    def occupancy(self) -> np.ndarray:
+        """
+        :return: (N, rows, cols) bool, the cells covered by a block
+        """
+        free = self._free(self._anchors(self._by_cell()))
+        return np.moveaxis(~self._shifted(free, 0, 0), -1, 0)
+
+    def _legal(self) -> np.ndarray:
+        """
+        :return: (4, rows, cols, N) bool, legal_mask before it is moved back to board first
+        """
+        anchors = self._anchors(self._by_cell())
+        free = self._free(anchors)
+        mask = np.zeros((4, self.rows, self.cols, len(self)), dtype=bool)
+        for typ, is_typ in anchors.items():
+            for direction in range(4):
+                movable = is_typ.copy()
+                for d_row, d_col in self._probes[typ][direction]:
+                    movable &= self._shifted(free, d_row, d_col)
+                mask[direction] |= movable
+        return mask
+
+    def legal_mask(self) -> np.ndarray:
+        """
+        every move that would succeed, the same moves Grid.legal_moves gives
+        :return: (N, 4, rows, cols) bool, true at the topleft of a block for every direction it can move in
+        """
+        return np.moveaxis(self._legal(), -1, 0)
+
+    def count_moves(self) -> np.ndarray:
+        """
+        :return: (N,) how many moves every board has
+        """
+        return np.count_nonzero(self._legal().reshape(-1, len(self)), axis=0)
+
+    def owners(self, row: IntOrArray, col: IntOrArray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        the block covering row-col on every board, like Grid._owner
+        :param row: one row for every board or (N,)
+        :param col: one col for every board or (N,)
+        :return: (N,) types, 0 where there is no block, and the rows and cols of their topleft
+        """
+        count = len(self)
+        row = np.broadcast_to(np.asarray(row, dtype=np.intp), (count,))
+        col = np.broadcast_to(np.asarray(col, dtype=np.intp), (count,))
+        inside = (row >= 0) & (row < self.rows) & (col >= 0) & (col < self.cols)
+        # a cell off the board has no block, the clipped one only has to stay in the padding
+        row = np.clip(row, -1, self.rows)
+        col = np.clip(col, -1, self.cols)
+
+        padded = self._padded(self._by_cell())
+        boards = np.arange(count)
+        types = np.zeros(count, dtype=np.uint8)
+        anchor_rows = np.zeros(count, dtype=np.intp)
+        anchor_cols = np.zeros(count, dtype=np.intp)
+        for typ, d_row, d_col in self._cover:
+            anchor_row, anchor_col = row - d_row, col - d_col
+            found = inside & (types == 0) & (padded[anchor_row + self._border, anchor_col + self._border, boards] == typ)
+            types[found] = typ
+            anchor_rows[found] = anchor_row[found]
+            anchor_cols[found] = anchor_col[found]
+        return types, anchor_rows, anchor_cols
+
+    def move(self, row: IntOrArray, col: IntOrArray, direction: IntOrArray) -> np.ndarray:
+        """
+        Grid.move on every board at once
+        :param row: any cell of the block, one for every board or (N,)
+        :param col: any cell of the block, one for every board or (N,)
+        :param direction: one of Directions.*, one for every board or (N,)
+        :return: (N,) bool, which boards the block moved on
+        """
+        count = len(self)
+        types, anchor_rows, anchor_cols = self.owners(row, col)
+        direction = np.broadcast_to(np.asarray(direction, dtype=np.intp), (count,))
+        moved = (types != 0) & (direction >= 0) & (direction < 4)
+
+        free = self._free(self._anchors(self._by_cell()))
+        boards = np.arange(count)
+        for typ in np.unique(types[moved]).tolist():
+            for d in range(4):
+                picked = moved & (types == typ) & (direction == d)
+                for d_row, d_col in self._probes[typ][d]:
+                    picked &= free[anchor_rows + self._border + d_row, anchor_cols + self._border + d_col, boards]
+                moved &= (types != typ) | (direction != d) | picked
+
+        boards = np.flatnonzero(moved)
+        deltas = np.array(self.tables.delta, dtype=np.intp)[direction[boards]]
+        self.boards[boards, anchor_rows[boards], anchor_cols[boards]] = grid.Blocks.BLOCK_NONE
+        self.boards[boards, anchor_rows[boards] + deltas[:, 0], anchor_cols[boards] + deltas[:, 1]] = types[boards]
+        return moved
+
+    def keys(self) -> np.ndarray:
+        """
+        :return: (N,) np.uint64, Tables.pack of every board
+        """
+        bits = self.tables.bits_per_cell
+        assert bits * self.rows * self.cols <= 64, "the packed boards do not fit in a np.uint64"
+        shifts = np.arange(self.rows * self.cols, dtype=np.uint64) * np.uint64(bits)
+        cells = self.boards.reshape(len(self), -1).astype(np.uint64)
+        return np.bitwise_or.reduce(cells << shifts, axis=1)
+
+    @staticmethod
+    def from_keys(keys: np.ndarray, rows: int=cfg.GRID_ROWS, cols: int=cfg.GRID_COLS, types: Optional[Iterable[int]]=None) -> "BoardBatch":
+        tables = bitboard.get_tables(rows, cols, types)
+        shifts = np.arange(rows * cols, dtype=np.uint64) * np.uint64(tables.bits_per_cell)
+        cells = (np.asarray(keys, dtype=np.uint64)[:, None] >> shifts) & np.uint64(tables.cell_mask)
+        return BoardBatch(cells.astype(np.uint8).reshape((-1, rows, cols)), tables.types)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="compare moving blocks on a batch of boards with a Grid per board")
+    parser.add_argument("--boards", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    for count in args.boards:
+        tables = bitboard.get_tables()
+        boards = BoardBatch(np.stack([
+            tables.to_array(tables.random_layout(generator.gen_random_counts())[0])
+            for _ in range(count)
+        ]))
+        grids = [boards.to_grid(index) for index in range(count)]
+
+        start_time = time.perf_counter()
+        for board in grids:
+            board.legal_moves()
+            for direction in range(4):
+                board.move(2, 1, direction)
+        grid_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        boards.legal_mask()
+        for direction in range(4):
+            boards.move(2, 1, direction)
+        batch_time = time.perf_counter() - start_time
+
+        assert all((board.get_grid() == boards.boards[index]).all() for index, board in enumerate(grids))
+        print(f"{count:6} boards: Grid {count / grid_time:10.0f} boards/s, "
+              f"BoardBatch {count / batch_time:10.0f} boards/s, {grid_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from typing import List, Dict, Optional, Union, Iterable, Tuple
+
+import src.grid as grid
+import src.bitboard as bitboard
+
+import numpy as np
+
+
+IntOrArray = Union[int, np.ndarray]
+
+
+class BoardBatch:
+    boards: np.ndarray
+    rows: int
+    cols: int
+    types: Tuple[int, ...]
+    tables: bitboard.Tables
+    _cover: List[Tuple[int, int, int]]
+    _probes: Dict[int, List[List[Tuple[int, int]]]]
+    _border: int
+
+    def __init__(self, boards: np.ndarray, types: Optional[Iterable[int]]=None) -> None: ...
+    @staticmethod
+    def from_boards(boards: Iterable[Union[grid.Grid, bitboard.BitGrid, np.ndarray]], types: Optional[Iterable[int]]=None) -> BoardBatch: ...
+    def __len__(self) -> int: ...
+    def copy(self) -> BoardBatch: ...
+    def to_grid(self, index: int) -> grid.Grid: ...
+    # the boards as (rows, cols, N)
+    def _by_cell(self) -> np.ndarray: ...
+    def _padded(self, array: np.ndarray) -> np.ndarray: ...
+    def _shifted(self, padded: np.ndarray, d_row: int, d_col: int) -> np.ndarray: ...
+    def _anchors(self, cells: np.ndarray) -> Dict[int, np.ndarray]: ...
+    def _free(self, anchors: Dict[int, np.ndarray]) -> np.ndarray: ...
+    # (N, rows, cols) bool
+    def occupancy(self) -> np.ndarray: ...
+    def _legal(self) -> np.ndarray: ...
+    # (N, 4, rows, cols) bool, true at the topleft of a block for every direction it can move in
+    def legal_mask(self) -> np.ndarray: ...
+    def count_moves(self) -> np.ndarray: ...
+    # (N,) types and the rows and cols of their topleft
+    def owners(self, row: IntOrArray, col: IntOrArray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]: ...
+    # Grid.move on every board, (N,) bool of the boards the block moved on
+    def move(self, row: IntOrArray, col: IntOrArray, direction: IntOrArray) -> np.ndarray: ...
+    # (N,) np.uint64, Tables.pack of every board
+    def keys(self) -> np.ndarray: ...
+    @staticmethod
+    def from_keys(keys: np.ndarray, rows: int=..., cols: int=..., types: Optional[Iterable[int]]=None) -> BoardBatch: ...
+
+
+def main() -> None: ...
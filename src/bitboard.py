@@ -0,0 +1,623 @@
+"""
+a bitboard version of the grid
+
+the whole board is a single int made of (the biggest block type + 1) fields of rows * cols bits each
+    field 0 is the occupancy, a bit is set for every cell covered by a block
+    field n is the anchors of type n, a bit is set where the topleft of a block of that type is
+
+bit (row * cols + col) of a field is the cell at row-col, so the anchors are the same
+as the values in the grid module docstring
+
+lets say 1 is 2x2, this grid
+[[0, 0, 0, 0]
+ [0, 0, 0, 0]
+ [0, 0, 0, 0]
+ [0, 0, 1, 0]
+ [0, 0, 0, 0]]
+has bits 14, 15, 18 and 19 set in field 0 and bit 14 set in field 4
+
+moving a block is a xor of the state with a precomputed mask and all the legal
+moves of one block type are found at once with shifts and masks on the occupancy
+
+the board looks the same flipped left to right, so a state and its mirror image are
+as far from each other's mirrors as they are from each other, canonical picks one of
+the two so tables of states only have to hold half of them, the mirror of a state is
+every column of every field moved to the other side and then every anchor field moved
+by how far the anchor of its shape moves when the shape is flipped, the 2x1 and 2x2
+anchors go one column left and the L pieces also change their type
+"""
+
+from typing import List, Dict, Optional, Union, Tuple, Iterator, Iterable
+
+import src.config as cfg
+import src.grid as grid
+
+import numpy as np
+
+import functools
+import random
+
+
+class Tables:
+    def __init__(self, rows: int, cols: int, types: Iterable[int]) -> None:
+        """
+        :param rows: int
+        :param cols: int
+        :param types: the grid.Blocks.BLOCK_* a board can hold, their shapes come from grid.Blocks.SHAPES
+        """
+        self.rows: int = rows
+        self.cols: int = cols
+        self.cells: int = rows * cols
+        self.full: int = (1 << self.cells) - 1
+
+        self.types: List[int] = sorted(types)
+        self.fields: int = max(self.types) + 1
+
+        # (row, col) the anchor moves by for every direction
+        self.delta: List[Tuple[int, int]] = [(0, 0)] * 4
+        self.delta[grid.Directions.RIGHT] = (0, 1)
+        self.delta[grid.Directions.LEFT] = (0, -1)
+        self.delta[grid.Directions.UP] = (-1, 0)
+        self.delta[grid.Directions.DOWN] = (1, 0)
+        # how far the anchor bit moves for every direction
+        self.step: List[int] = [d_row * cols + d_col for d_row, d_col in self.delta]
+
+        # typ -> anchor -> cells covered, 0 if the block does not fit there
+        self.footprint: Dict[int, List[int]] = {}
+        # typ -> direction -> anchors that stay on the board after the move
+        self.movable: Dict[int, List[int]] = {}
+        # typ -> direction -> offsets from the anchor of the cells the block moves into
+        self.probes: Dict[int, List[List[int]]] = {}
+        # typ -> direction -> anchor -> the mask to xor the state with
+        self.toggle: Dict[int, List[List[int]]] = {}
+        # cell -> (typ, anchor) of every block that would cover it
+        self.cover: List[List[Tuple[int, int]]] = [[] for _ in range(self.cells)]
+
+        for typ in self.types:
+            shape = grid.Blocks.SHAPES[typ]
+
+            self.footprint[typ] = [0] * self.cells
+            for row in range(rows):
+                for col in range(cols):
+                    if not all(0 <= row + r < rows and 0 <= col + c < cols for r, c in shape):
+                        continue
+                    anchor = row * cols + col
+                    for r, c in shape:
+                        self.footprint[typ][anchor] |= 1 << ((row + r) * cols + col + c)
+                        self.cover[(row + r) * cols + col + c].append((typ, anchor))
+
+            # a probe can point to the left of the anchor, movable makes sure it never wraps around a row
+            self.probes[typ] = [
+                [r * cols + c for r, c in grid.Blocks.probes(typ, d_row, d_col)]
+                for d_row, d_col in self.delta
+            ]
+
+            self.movable[typ] = [0] * 4
+            self.toggle[typ] = [[0] * self.cells for _ in range(4)]
+            for anchor in range(self.cells):
+                if not self.footprint[typ][anchor]:
+                    continue
+                row, col = divmod(anchor, cols)
+                for direction, (d_row, d_col) in enumerate(self.delta):
+                    new_row, new_col = row + d_row, col + d_col
+                    if not (0 <= new_row < rows and 0 <= new_col < cols):
+                        continue
+                    moved = new_row * cols + new_col
+                    if not self.footprint[typ][moved]:
+                        continue
+                    self.movable[typ][direction] |= 1 << anchor
+                    self.toggle[typ][direction][anchor] = (
+                        self.footprint[typ][anchor] ^ self.footprint[typ][moved] |
+                        ((1 << anchor) | (1 << moved)) << (typ * self.cells)
+                    )
+
+        # the packed form of a state keeps the type of the block anchored in every cell
+        self.bits_per_cell: int = max(self.types).bit_length()
+        self.cell_mask: int = (1 << self.bits_per_cell) - 1
+
+        # cell -> value -> a random 64 bit number, the zobrist hash of a board is the xor
+        # of the numbers for the value in every cell, empty cells are 0 so they add nothing
+        # the seed is fixed so a board hashes the same in every process
+        rng = random.Random(f"zobrist {rows}x{cols}")
+        self.zobrist: List[List[int]] = [
+            [0] + [rng.getrandbits(64) for _ in range(self.cell_mask)]
+            for _ in range(self.cells)
+        ]
+
+        # typ -> every anchor where the block fits on the board
+        self.anchors_of: Dict[int, List[int]] = {
+            typ: [anchor for anchor in range(self.cells) if self.footprint[typ][anchor]]
+            for typ in self.types
+        }
+
+        # the same tables flattened for neighbours, the free cells get shifted up by
+        # one field first so every probe is a right shift
+        self.moves: List[Tuple[int, List[Tuple[int, List[int], List[int]]]]] = [
+            (typ * self.cells, [
+                (self.movable[typ][direction], [self.cells + offset for offset in self.probes[typ][direction]], self.toggle[typ][direction])
+                for direction in range(4)
+            ])
+            for typ in self.types
+        ]
+
+        # bit shift -> the fields that move by it after their columns are flipped, None when
+        # a type flips into one the board can not hold and states have no mirror image
+        self.mirror_shifts: Optional[Dict[int, int]] = {0: self.full}
+        for typ in self.types:
+            other = grid.Blocks.mirror(typ)
+            if other not in self.types:
+                self.mirror_shifts = None
+                break
+            shape = grid.Blocks.SHAPES[typ]
+            # column c covers up to c + right, flipped its left is cols - 1 - c - right
+            right = max(col for _, col in shape)
+            shift = (other - typ) * self.cells - right - grid.Blocks.LEFT[other]
+            self.mirror_shifts[shift] = self.mirror_shifts.get(shift, 0) | self.full << (typ * self.cells)
+
+        # (bits, shift) the column flip and the field shift in one, the bits of a column of
+        # the fields that move the same way, split by the way they get shifted
+        self.mirror_left: List[Tuple[int, int]] = []
+        self.mirror_right: List[Tuple[int, int]] = []
+        for col in range(cols if self.mirror_shifts is not None else 0):
+            column = sum(1 << cell for cell in range(col, self.fields * self.cells, cols))
+            for shift, fields in self.mirror_shifts.items():
+                # fields are the same before and after the columns are flipped
+                bits = column & fields
+                shift += cols - 1 - 2 * col
+                if shift >= 0:
+                    self.mirror_left.append((bits, shift))
+                else:
+                    self.mirror_right.append((bits, -shift))
+
+        # moves with the mirror image of every toggle as well, mirror only moves bits around
+        # so the mirror image of state ^ toggle is the mirror image of state ^ mirror(toggle)
+        self.mirror_moves: Optional[List[Tuple[int, List[Tuple[int, List[int], List[int], List[int]]]]]] = None
+        if self.mirror_shifts is not None:
+            self.mirror_moves = [
+                (shift, [
+                    (movable, probes, toggle, [self.mirror(mask) for mask in toggle])
+                    for movable, probes, toggle in moves
+                ])
+                for shift, moves in self.moves
+            ]
+
+    def anchors(self, state: int, typ: int) -> int:
+        return (state >> (typ * self.cells)) & self.full
+
+    def occupancy(self, state: int) -> int:
+        return state & self.full
+
+    def can_move(self, state: int, typ: int, anchor: int, direction: int) -> bool:
+        if not (self.movable[typ][direction] >> anchor) & 1:
+            return False
+        for offset in self.probes[typ][direction]:
+            if (state >> (anchor + offset)) & 1:
+                return False
+        return True
+
+    def movable_anchors(self, state: int, typ: int, direction: int) -> int:
+        free = ~state & self.full
+        movable = self.anchors(state, typ) & self.movable[typ][direction]
+        for offset in self.probes[typ][direction]:
+            movable &= free >> offset if offset >= 0 else free << -offset
+        return movable
+
+    def successors(self, state: int) -> Iterator[Tuple[int, int, int, int]]:
+        """
+        every legal move of a state
+        :param state: int
+        :return: (typ, anchor, direction, new state) for every move
+        """
+        for typ in self.types:
+            if not self.anchors(state, typ):
+                continue
+            for direction in range(4):
+                movable = self.movable_anchors(state, typ, direction)
+                toggle = self.toggle[typ][direction]
+                while movable:
+                    low = movable & -movable
+                    anchor = low.bit_length() - 1
+                    yield typ, anchor, direction, state ^ toggle[anchor]
+                    movable ^= low
+
+    def slide(self, state: int, typ: int, anchor: int, direction: int, max_steps: Optional[int]=None) -> List[int]:
+        """
+        moves one block in a direction until it hits something or has gone max_steps
+        :param state: int
+        :param typ: the type of the block
+        :param anchor: the topleft of the block
+        :param direction: one of grid.Directions.*
+        :param max_steps: None to go as far as it can
+        :return: the state after every step
+        """
+        states = []
+        toggle = self.toggle[typ][direction]
+        while (max_steps is None or len(states) < max_steps) and self.can_move(state, typ, anchor, direction):
+            state ^= toggle[anchor]
+            anchor += self.step[direction]
+            states.append(state)
+        return states
+
+    def slide_neighbours(self, state: int) -> List[int]:
+        """
+        the neighbours of a state when a block sliding any number of cells in one
+        direction counts as a single move
+        :param state: int
+        :return: List[int]
+        """
+        result = []
+        for typ in self.types:
+            if not self.anchors(state, typ):
+                continue
+            for direction in range(4):
+                movable = self.movable_anchors(state, typ, direction)
+                while movable:
+                    low = movable & -movable
+                    result += self.slide(state, typ, low.bit_length() - 1, direction)
+                    movable ^= low
+        return result
+
+    def legal_moves(self, state: int) -> List[Tuple[int, int, int]]:
+        """
+        every legal move of a state found with the tables, nothing gets moved to try it
+        :param state: int
+        :return: (row, col, direction) for every move, row-col being the topleft of the block
+        """
+        result = []
+        for typ in self.types:
+            if not self.anchors(state, typ):
+                continue
+            for direction in range(4):
+                movable = self.movable_anchors(state, typ, direction)
+                while movable:
+                    low = movable & -movable
+                    result.append((*divmod(low.bit_length() - 1, self.cols), direction))
+                    movable ^= low
+        return result
+
+    def neighbours(self, state: int) -> List[int]:
+        result = []
+        append = result.append
+        full = self.full
+        free = (~state & full) << self.cells
+        for shift, moves in self.moves:
+            anchors = (state >> shift) & full
+            if not anchors:
+                continue
+            for movable, probes, toggle in moves:
+                movable &= anchors
+                for probe in probes:
+                    movable &= free >> probe
+                while movable:
+                    low = movable & -movable
+                    append(state ^ toggle[low.bit_length() - 1])
+                    movable ^= low
+        return result
+
+    def mirrored_neighbours(self, state: int, mirrored: int) -> List[Tuple[int, int]]:
+        """
+        neighbours without a call to mirror for every one of them
+        :param state: int
+        :param mirrored: self.mirror(state)
+        :return: (neighbour, its mirror image) for every neighbour
+        """
+        assert self.mirror_moves is not None, f"the mirror images of {self.types} are not all in the types"
+        result = []
+        append = result.append
+        full = self.full
+        free = (~state & full) << self.cells
+        for shift, moves in self.mirror_moves:
+            anchors = (state >> shift) & full
+            if not anchors:
+                continue
+            for movable, probes, toggle, mirror_toggle in moves:
+                movable &= anchors
+                for probe in probes:
+                    movable &= free >> probe
+                while movable:
+                    low = movable & -movable
+                    anchor = low.bit_length() - 1
+                    append((state ^ toggle[anchor], mirrored ^ mirror_toggle[anchor]))
+                    movable ^= low
+        return result
+
+    def random_layout(self, counts: Dict[int, int], max_attempts: int=10_000) -> Tuple[int, int]:
+        """
+        fills the cells in order, the first free cell either stays empty or gets the anchor
+        of one of the blocks left, every shape is sorted so its anchor is its first cell and
+        a block never has to go back over the cells before it, the choice is random with the
+        blocks that have the most copies left and the empty cells the most likely, and when
+        nothing fits the choice before it is undone and the next one tried, so a board the
+        blocks fill completely is found as well
+        :param counts: a pair of Blocks.BLOCK_* and the count of each one
+        :param max_attempts: the most choices to try before giving up
+        :return: the state and how many choices were tried
+        """
+        left = {typ: count for typ, count in counts.items() if count}
+        sizes = {typ: len(grid.Blocks.SHAPES[typ]) for typ in left}
+        needed = sum(sizes[typ] * count for typ, count in left.items())
+        if needed > self.cells:
+            raise ValueError(f"{needed} cells worth of blocks do not fit in {self.cells} cells")
+
+        attempts = 0
+        state, cell, spare = 0, 0, self.cells - needed
+        # for every cell a choice was made at the state and spare cells before it, the
+        # choices not tried yet and the one made, None before the first one
+        frames: List[list] = []
+
+        while needed:
+            while (state >> cell) & 1:
+                cell += 1
+            frames.append([cell, state, spare, self._layout_choices(state, cell, left, spare), None])
+
+            while True:
+                cell, state, spare, choices, typ = frames[-1]
+                if typ is not None and typ != grid.Blocks.BLOCK_NONE:
+                    left[typ] += 1
+                    needed += sizes[typ]
+                if attempts >= max_attempts:
+                    raise ValueError(f"could not place {counts} in {attempts} attempts")
+                if choices:
+                    break
+                frames.pop()
+                if not frames:
+                    raise ValueError(f"{counts} do not fit in {self.rows}x{self.cols}")
+
+            attempts += 1
+            typ = frames[-1][4] = choices.pop()
+            if typ == grid.Blocks.BLOCK_NONE:
+                spare -= 1
+                cell += 1
+            else:
+                left[typ] -= 1
+                needed -= sizes[typ]
+                state = self.place(state, typ, cell)
+
+        return state, attempts
+
+    def _layout_choices(self, state: int, cell: int, left: Dict[int, int], spare: int) -> List[int]:
+        """
+        :return: the blocks left that fit with their anchor on cell, and BLOCK_NONE when
+        it can stay empty, in a random order weighted by how many of each are left with
+        the first one to try last
+        """
+        occupancy = state & self.full
+        weights = {typ: count for typ, count in left.items()
+                   if count and self.footprint[typ][cell] and not self.footprint[typ][cell] & occupancy}
+        if spare:
+            weights[grid.Blocks.BLOCK_NONE] = spare
+        # a weighted shuffle, the bigger the weight the bigger the key is likely to be
+        return sorted(weights, key=lambda typ: random.random() ** (1 / weights[typ]))
+
+    def pack(self, state: int) -> int:
+        """
+        the same board with bits_per_cell bits for every cell holding the value the grid
+        module would have there, 3 bits for 20 cells fits in a np.uint64
+        :param state: int
+        :return: int
+        """
+        key = 0
+        for typ in self.types:
+            anchors = self.anchors(state, typ)
+            while anchors:
+                low = anchors & -anchors
+                key |= typ << ((low.bit_length() - 1) * self.bits_per_cell)
+                anchors ^= low
+        return key
+
+    def zobrist_hash(self, state: int) -> int:
+        result = 0
+        for typ in self.types:
+            anchors = self.anchors(state, typ)
+            while anchors:
+                low = anchors & -anchors
+                result ^= self.zobrist[low.bit_length() - 1][typ]
+                anchors ^= low
+        return result
+
+    def unpack(self, key: int) -> int:
+        state = 0
+        anchor = 0
+        while key:
+            typ = key & self.cell_mask
+            if typ:
+                state = self.place(state, typ, anchor)
+            key >>= self.bits_per_cell
+            anchor += 1
+        return state
+
+    def mirror(self, state: int) -> int:
+        """
+        the state flipped left to right
+        :param state: int
+        :return: int
+        """
+        assert self.mirror_shifts is not None, f"the mirror images of {self.types} are not all in the types"
+        mirrored = 0
+        for bits, shift in self.mirror_left:
+            mirrored |= (state & bits) << shift
+        for bits, shift in self.mirror_right:
+            mirrored |= (state & bits) >> shift
+        return mirrored
+
+    def canonical(self, state: int) -> int:
+        """
+        the smaller of a state and its mirror image, the state itself when it has none
+        :param state: int
+        :return: int
+        """
+        if self.mirror_shifts is None:
+            return state
+        return min(state, self.mirror(state))
+
+    def place(self, state: int, typ: int, anchor: int) -> int:
+        return state | self.footprint[typ][anchor] | (1 << (typ * self.cells + anchor))
+
+    def from_array(self, array: np.ndarray) -> int:
+        state = 0
+        for anchor, value in enumerate(np.asarray(array, dtype=np.uint8).ravel().tolist()):
+            if value:
+                state = self.place(state, value, anchor)
+        return state
+
+    def to_array(self, state: int) -> np.ndarray:
+        array = np.zeros(self.cells, dtype=np.uint8)
+        for typ in self.types:
+            anchors = self.anchors(state, typ)
+            while anchors:
+                low = anchors & -anchors
+                array[low.bit_length() - 1] = typ
+                anchors ^= low
+        return array.reshape((self.rows, self.cols))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tables(rows: int, cols: int, types: Tuple[int, ...]) -> Tables:
+    return Tables(rows, cols, types)
+
+
+def get_tables(rows: int=cfg.GRID_ROWS, cols: int=cfg.GRID_COLS, types: Optional[Iterable[int]]=None) -> Tables:
+    """
+    the tables are only built once for every board size and set of block types
+    :param rows: int
+    :param cols: int
+    :param types: the grid.Blocks.BLOCK_* a board can hold, None for grid.Blocks.CLASSIC
+    :return: Tables
+    """
+    return _get_tables(rows, cols, tuple(sorted(grid.Blocks.CLASSIC if types is None else types)))
+
+
+class BitGrid:
+    def __init__(self, rows: int=cfg.GRID_ROWS, cols: int=cfg.GRID_COLS, types: Optional[Iterable[int]]=None) -> None:
+        self.rows: int = rows
+        self.cols: int = cols
+
+        self.tables: Tables = get_tables(rows, cols, types)
+        self.types: Tuple[int, ...] = tuple(self.tables.types)
+        self.state: int = 0
+
+    @staticmethod
+    def from_grid(other: Union["grid.Grid", "BitGrid"]) -> "BitGrid":
+        bit_grid = BitGrid(other.rows, other.cols, other.types)
+        bit_grid.set(other.get_grid())
+        return bit_grid
+
+    def set(self, grid_: Union[np.ndarray, List[List[int]]], copy: bool=True) -> None:
+        # the state is always built from the array so there is nothing to copy or not
+        array = np.asarray(grid_, dtype=np.uint8)
+        assert array.shape == (self.rows, self.cols), f"grid shape {array.shape} != {(self.rows, self.cols)}"
+        self.state = self.tables.from_array(array)
+
+    @property
+    def key(self) -> int:
+        return self.tables.pack(self.state)
+
+    @property
+    def zobrist(self) -> int:
+        return self.tables.zobrist_hash(self.state)
+
+    def canonical_key(self) -> int:
+        return self.tables.pack(self.tables.canonical(self.state))
+
+    def tobytes(self) -> bytes:
+        return self.tables.to_array(self.state).tobytes()
+
+    def get_grid(self) -> np.ndarray:
+        return self.tables.to_array(self.state)
+
+    def print(self) -> None:
+        print(self.get_grid())
+
+    def at(self, row: int, col: int) -> int:
+        if not self.check_if_in_bounds(row, col):
+            return 0
+        anchor = row * self.cols + col
+        for typ in self.tables.types:
+            if (self.state >> (typ * self.tables.cells + anchor)) & 1:
+                return typ
+        return 0
+
+    def random_gen(self, counts: Dict[int, int]) -> int:
+        self.state, attempts = self.tables.random_layout(counts)
+        return attempts
+
+    def set_at(self, row: int, col: int, value: int) -> bool:
+        if self.if_block_at(row, col) or value not in self.tables.footprint:
+            return False
+        footprint = self.tables.footprint[value][row * self.cols + col]
+        if not footprint or footprint & self.state:
+            return False
+        self.state = self.tables.place(self.state, value, row * self.cols + col)
+        return True
+
+    def if_block_at(self, row: int, col: int) -> bool:
+        return bool(self.block_at(row, col))
+
+    def check_if_in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def _owner(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        for typ, anchor in self.tables.cover[row * self.cols + col]:
+            if (self.state >> (typ * self.tables.cells + anchor)) & 1:
+                return typ, anchor
+        return None
+
+    def block_at(self, row: int, col: int) -> int:
+        if not self.check_if_in_bounds(row, col):
+            return grid.Blocks.BLOCK_WALL
+        if not (self.state >> (row * self.cols + col)) & 1:
+            return grid.Blocks.BLOCK_NONE
+        return self._owner(row, col)[0]
+
+    def locate_block(self, row: int, col: int, typ: int) -> Optional["grid.GridVector"]:
+        if not self.check_if_in_bounds(row, col):
+            return None
+        owner = self._owner(row, col)
+        if owner is None or owner[0] != typ:
+            return None
+        return grid.GridVector(*divmod(owner[1], self.cols))
+
+    def legal_moves(self) -> List[Tuple[int, int, int]]:
+        return self.tables.legal_moves(self.state)
+
+    def slide(self, row: int, col: int, direction: int, max_steps: Optional[int]=None) -> List["grid.GridVector"]:
+        if not self.check_if_in_bounds(row, col) or not 0 <= direction < 4:
+            return []
+        owner = self._owner(row, col)
+        if owner is None:
+            return []
+
+        typ, anchor = owner
+        states = self.tables.slide(self.state, typ, anchor, direction, max_steps)
+        if states:
+            self.state = states[-1]
+
+        d_row, d_col = self.tables.delta[direction]
+        row, col = divmod(anchor, self.cols)
+        return [grid.GridVector(row + d_row * step, col + d_col * step) for step in range(1, len(states) + 1)]
+
+    def move(self, row: int, col: int, direction: int) -> bool:
+        if not self.check_if_in_bounds(row, col) or not 0 <= direction < 4:
+            return False
+        owner = self._owner(row, col)
+        if owner is None:
+            return False
+
+        typ, anchor = owner
+        if not self.tables.can_move(self.state, typ, anchor, direction):
+            return False
+
+        self.state ^= self.tables.toggle[typ][direction][anchor]
+        return True
+
+    def move_right(self, row: int, col: int) -> bool:
+        return self.move(row, col, grid.Directions.RIGHT)
+
+    def move_left(self, row: int, col: int) -> bool:
+        return self.move(row, col, grid.Directions.LEFT)
+
+    def move_down(self, row: int, col: int) -> bool:
+        return self.move(row, col, grid.Directions.DOWN)
+
+    def move_up(self, row: int, col: int) -> bool:
+        return self.move(row, col, grid.Directions.UP)
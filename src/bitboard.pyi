@@ -0,0 +1,112 @@
+from typing import Dict, List, Union, Optional, Tuple, Iterator, Iterable
+
+import src.grid as grid
+
+import numpy as np
+
+
+class Tables:
+    rows: int
+    cols: int
+    cells: int
+    full: int
+    types: List[int]
+    fields: int
+    delta: List[Tuple[int, int]]
+    step: List[int]
+    footprint: Dict[int, List[int]]
+    movable: Dict[int, List[int]]
+    probes: Dict[int, List[List[int]]]
+    toggle: Dict[int, List[List[int]]]
+    cover: List[List[Tuple[int, int]]]
+    bits_per_cell: int
+    cell_mask: int
+    anchors_of: Dict[int, List[int]]
+    zobrist: List[List[int]]
+    moves: List[Tuple[int, List[Tuple[int, List[int], List[int]]]]]
+    # None when the types have no mirror images on the board
+    mirror_shifts: Optional[Dict[int, int]]
+    mirror_left: List[Tuple[int, int]]
+    mirror_right: List[Tuple[int, int]]
+    mirror_moves: Optional[List[Tuple[int, List[Tuple[int, List[int], List[int], List[int]]]]]]
+
+    # the shapes of types come from grid.Blocks.SHAPES
+    def __init__(self, rows: int, cols: int, types: Iterable[int]) -> None: ...
+    def anchors(self, state: int, typ: int) -> int: ...
+    def occupancy(self, state: int) -> int: ...
+    def can_move(self, state: int, typ: int, anchor: int, direction: int) -> bool: ...
+    def movable_anchors(self, state: int, typ: int, direction: int) -> int: ...
+    # (typ, anchor, direction, new state) for every legal move
+    def successors(self, state: int) -> Iterator[Tuple[int, int, int, int]]: ...
+    # the state after every step, max_steps None to go as far as the block can
+    def slide(self, state: int, typ: int, anchor: int, direction: int, max_steps: Optional[int]=None) -> List[int]: ...
+    # a slide of any length counts as one move
+    def slide_neighbours(self, state: int) -> List[int]: ...
+    # (row, col, direction) for every legal move, row-col being the topleft of the block
+    def legal_moves(self, state: int) -> List[Tuple[int, int, int]]: ...
+    def neighbours(self, state: int) -> List[int]: ...
+    # (neighbour, its mirror image) for every neighbour, mirrored being self.mirror(state)
+    def mirrored_neighbours(self, state: int, mirrored: int) -> List[Tuple[int, int]]: ...
+    # the state and how many choices were tried, the cells are filled in order and a
+    # choice that leaves nothing to fit is undone
+    def random_layout(self, counts: Dict[int, int], max_attempts: int=...) -> Tuple[int, int]: ...
+    # the blocks left that fit with their anchor on cell and BLOCK_NONE while spare, shuffled by weight
+    def _layout_choices(self, state: int, cell: int, left: Dict[int, int], spare: int) -> List[int]: ...
+    # bits_per_cell bits for every cell holding the value the grid would have there
+    def pack(self, state: int) -> int: ...
+    # the same as Grid.zobrist for a grid.Grid with the same cells
+    def zobrist_hash(self, state: int) -> int: ...
+    def unpack(self, key: int) -> int: ...
+    # the state flipped left to right
+    def mirror(self, state: int) -> int: ...
+    # the smaller of a state and its mirror image
+    def canonical(self, state: int) -> int: ...
+    def place(self, state: int, typ: int, anchor: int) -> int: ...
+    def from_array(self, array: np.ndarray) -> int: ...
+    def to_array(self, state: int) -> np.ndarray: ...
+
+
+def _get_tables(rows: int, cols: int, types: Tuple[int, ...]) -> Tables: ...
+# built once for every board size and set of block types, types None for grid.Blocks.CLASSIC
+def get_tables(rows: int=..., cols: int=..., types: Optional[Iterable[int]]=None) -> Tables: ...
+
+
+class BitGrid:
+    rows: int
+    cols: int
+    tables: Tables
+    types: Tuple[int, ...]
+    state: int
+
+    def __init__(self, rows: int=..., cols: int=..., types: Optional[Iterable[int]]=None) -> None: ...
+    @staticmethod
+    def from_grid(other: Union[grid.Grid, BitGrid]) -> BitGrid: ...
+    def set(self, grid_: Union[np.ndarray, List[List[int]]], copy: bool=True) -> None: ...
+    # Tables.pack of the state
+    @property
+    def key(self) -> int: ...
+    @property
+    def zobrist(self) -> int: ...
+    # key of the board or of its mirror image, whichever is smaller
+    def canonical_key(self) -> int: ...
+    def tobytes(self) -> bytes: ...
+    def get_grid(self) -> np.ndarray: ...
+    def print(self) -> None: ...
+    def at(self, row: int, col: int) -> int: ...
+    # a pair of Blocks.BLOCK_* and the count of each one, returns how many placements were tried
+    def random_gen(self, counts: Dict[int, int]) -> int: ...
+    def set_at(self, row: int, col: int, value: int) -> bool: ...
+    def if_block_at(self, row: int, col: int) -> bool: ...
+    def check_if_in_bounds(self, row: int, col: int) -> bool: ...
+    def block_at(self, row: int, col: int) -> int: ...
+    def locate_block(self, row: int, col: int, typ: int) -> Optional[grid.GridVector]: ...
+    # (row, col, direction) for every legal move, row-col being the topleft of the block
+    def legal_moves(self) -> List[Tuple[int, int, int]]: ...
+    # the topleft of the block after every step
+    def slide(self, row: int, col: int, direction: int, max_steps: Optional[int]=None) -> List[grid.GridVector]: ...
+    # direction is one of grid.Directions.*
+    def move(self, row: int, col: int, direction: int) -> bool: ...
+    def move_right(self, row: int, col: int) -> bool: ...
+    def move_left(self, row: int, col: int) -> bool: ...
+    def move_down(self, row: int, col: int) -> bool: ...
+    def move_up(self, row: int, col: int) -> bool: ...
@@ -29,6 +29,33 @@ SCREEN_SIZE: pygame.Vector2 = pygame.Vector2(WIDTH, HEIGHT)
 
 FPS: int = 60
 
+# how many moves away from its solution a new puzzle starts
+MIN_SOLUTION_DISTANCE: int = 12
+MAX_SOLUTION_DISTANCE: int = 30
+# seconds the generator may spend looking for a puzzle in that range
+GENERATION_TIME_BUDGET: float = 0.25
+# how many puzzles are kept ready so a new one never has to be waited for
+PREFETCH_SIZE: int = 4
+
+# seconds the win banner stays up before the next puzzle
+WIN_BANNER_TIME: float = 3.0
+
+# the most placements a pattern database may hold, the default patterns are made to fit in it
+PATTERN_MAX_STATES: int = 200_000
+
+# the most boards the hint map may hold and how deep a board outside of it is searched from
+HINT_MAX_STATES: int = 200_000
+HINT_MAX_DEPTH: int = 6
+# the most boards the search for a board outside the map may hold, it runs on the frame
+# asking for the hint so it is kept small and the hint falls back to solver.manhattan
+HINT_SEARCH_MAX_STATES: int = 5_000
+
+# every puzzle played gets a journal of its moves in Paths.JOURNALS, main.py --record turns it on
+RECORD_JOURNALS: bool = False
+
+# how many drawn boards Grid and Solution keep around as whole surfaces
+BOARD_CACHE_SIZE: int = 32
+
 TITLE: str = "Shifty"
 __MAIN_WIN: Optional[pygame.surface.Surface] = None
 
@@ -41,6 +68,9 @@ class Paths:
     SOUNDS: Path = DATA.joinpath("sounds")
     SOUNDTRACKS: Path = DATA.joinpath("soundtracks")
     FONTS: Path = DATA.joinpath("fonts")
+    STATESPACE: Path = DATA.joinpath("statespace")
+    PATTERNS: Path = DATA.joinpath("patterns")
+    JOURNALS: Path = DATA.joinpath("journals")
 
 
 def get_main_surface(flags: int=0) -> pygame.surface.Surface:
@@ -81,6 +111,17 @@ __all__ = [
     "HEIGHT",
     "SCREEN_SIZE",
     "FPS",
+    "MIN_SOLUTION_DISTANCE",
+    "MAX_SOLUTION_DISTANCE",
+    "GENERATION_TIME_BUDGET",
+    "PREFETCH_SIZE",
+    "WIN_BANNER_TIME",
+    "PATTERN_MAX_STATES",
+    "HINT_MAX_STATES",
+    "HINT_MAX_DEPTH",
+    "HINT_SEARCH_MAX_STATES",
+    "RECORD_JOURNALS",
+    "BOARD_CACHE_SIZE",
     "TITLE",
     "Paths",
     "get_main_surface",
@@ -0,0 +1,124 @@
+"""
+a file of pre-generated puzzles that is read through np.memmap
+
+the file is a 16 byte header followed by fixed width records
+    start     rows x cols uint8, the board the player starts with
+    solution  rows x cols uint8, the board to reach
+    distance  uint16, the least number of moves between the two
+
+the boards are stored the way the grid module stores them so a Grid or a Solution
+can use a record as its grid without copying it, the file is opened copy on write
+so moving blocks on such a board never changes the file
+
+records only ever get appended, how many there are comes from the size of the file
+"""
+
+from typing import List, Union, Iterator, Tuple
+
+import src.config as cfg
+import src.generator as generator
+
+import numpy as np
+
+from pathlib import Path
+
+
+MAGIC: bytes = b"SHFTYCRP"
+VERSION: int = 1
+
+HEADER: np.dtype = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("rows", "<u2"),
+    ("cols", "<u2"),
+    ("reserved", "V2"),
+])
+
+
+def record_dtype(rows: int=cfg.GRID_ROWS, cols: int=cfg.GRID_COLS) -> np.dtype:
+    return np.dtype([
+        ("start", np.uint8, (rows, cols)),
+        ("solution", np.uint8, (rows, cols)),
+        ("distance", "<u2"),
+    ])
+
+
+def read_header(path: Union[Path, str]) -> Tuple[int, int]:
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} is not a puzzle corpus")
+    if header["version"][0] != VERSION:
+        raise ValueError(f"{path} is version {header['version'][0]}, only version {VERSION} can be read")
+    return int(header["rows"][0]), int(header["cols"][0])
+
+
+class CorpusWriter:
+    def __init__(self, path: Union[Path, str], rows: int=cfg.GRID_ROWS, cols: int=cfg.GRID_COLS) -> None:
+        self.path: Path = Path(path)
+        self.rows: int = rows
+        self.cols: int = cols
+        self.dtype: np.dtype = record_dtype(rows, cols)
+
+        if self.path.exists() and self.path.stat().st_size:
+            assert read_header(self.path) == (rows, cols), f"{self.path} holds {read_header(self.path)} boards, not {(rows, cols)}"
+            self.file = open(self.path, "ab")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, "wb")
+            header = np.zeros(1, dtype=HEADER)
+            header["magic"] = MAGIC
+            header["version"] = VERSION
+            header["rows"] = rows
+            header["cols"] = cols
+            self.file.write(header.tobytes())
+
+    def write(self, puzzles: List[generator.Puzzle]) -> None:
+        records = np.empty(len(puzzles), dtype=self.dtype)
+        for i, puzzle in enumerate(puzzles):
+            records[i] = (puzzle.start, puzzle.solution, puzzle.distance)
+        self.write_records(records)
+
+    def write_records(self, records: np.ndarray) -> None:
+        assert records.dtype == self.dtype, f"record dtype {records.dtype} != {self.dtype}"
+        self.file.write(records.tobytes())
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class Corpus:
+    def __init__(self, path: Union[Path, str], mode: str="c") -> None:
+        """
+        :param path: the corpus file
+        :param mode: np.memmap mode, "c" lets boards be played without touching the file
+        """
+        self.path: Path = Path(path)
+        self.rows, self.cols = read_header(self.path)
+        self.dtype: np.dtype = record_dtype(self.rows, self.cols)
+
+        count = (self.path.stat().st_size - HEADER.itemsize) // self.dtype.itemsize
+        self.records: np.ndarray = np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode=mode,
+            offset=HEADER.itemsize,
+            shape=(count,),
+        ) if count else np.empty(0, dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> generator.Puzzle:
+        record = self.records[index]
+        return generator.Puzzle(record["start"], record["solution"], int(record["distance"]))
+
+    def __iter__(self) -> Iterator[generator.Puzzle]:
+        for index in range(len(self)):
+            yield self[index]
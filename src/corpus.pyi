@@ -0,0 +1,45 @@
+from typing import List, Union, Iterator, Tuple
+
+from pathlib import Path
+
+import src.generator as generator
+
+import numpy as np
+
+
+MAGIC: bytes
+VERSION: int
+HEADER: np.dtype
+
+
+def record_dtype(rows: int=..., cols: int=...) -> np.dtype: ...
+# (rows, cols) of the boards in the file
+def read_header(path: Union[Path, str]) -> Tuple[int, int]: ...
+
+
+class CorpusWriter:
+    path: Path
+    rows: int
+    cols: int
+    dtype: np.dtype
+
+    def __init__(self, path: Union[Path, str], rows: int=..., cols: int=...) -> None: ...
+    def write(self, puzzles: List[generator.Puzzle]) -> None: ...
+    def write_records(self, records: np.ndarray) -> None: ...
+    def close(self) -> None: ...
+    def __enter__(self) -> CorpusWriter: ...
+    def __exit__(self, *_) -> None: ...
+
+
+class Corpus:
+    path: Path
+    rows: int
+    cols: int
+    dtype: np.dtype
+    records: np.ndarray
+
+    def __init__(self, path: Union[Path, str], mode: str=...) -> None: ...
+    def __len__(self) -> int: ...
+    # the boards of the puzzle are views into the file
+    def __getitem__(self, index: int) -> generator.Puzzle: ...
+    def __iter__(self) -> Iterator[generator.Puzzle]: ...
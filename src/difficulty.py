@@ -0,0 +1,218 @@
+"""
+how hard a puzzle is and an index of a corpus sorted by it
+
+a bfs back from the solution gives how many moves every board up to the start is
+away from it, walking forward from the start through only the moves that get one
+closer visits every board on a shortest solution, at each of them a player has
+    branching   moves to pick from
+    dead ends   the share of those that do not get any closer
+the rating puts the length and the dead ends together in a single number
+
+the index is a .npy file next to the corpus holding one entry per puzzle sorted by
+the rating, so a puzzle of some rating is found with a binary search
+
+run it with
+    python -m src.difficulty --corpus data/corpus/puzzles.bin
+to build the index of a corpus made by generate.py
+"""
+
+from typing import Optional, Union, Tuple
+
+import src.bitboard as bitboard
+import src.solver as solver
+import src.corpus as corpus
+import src.generator as generator
+
+import numpy as np
+
+from pathlib import Path
+import multiprocessing
+import argparse
+import random
+import time
+import os
+
+
+INDEX_DTYPE: np.dtype = np.dtype([
+    ("rating", "<u2"),
+    ("distance", "<u2"),
+    ("branching", "<f4"),
+    ("dead_ends", "<f4"),
+    ("record", "<u4"),
+])
+
+
+class Difficulty:
+    def __init__(self, distance: int, branching: float, dead_ends: float) -> None:
+        """
+        :param distance: the least number of moves
+        :param branching: the average number of moves on the boards of the shortest solutions
+        :param dead_ends: the share of those moves that do not get closer to the solution
+        """
+        self.distance: int = distance
+        self.branching: float = branching
+        self.dead_ends: float = dead_ends
+
+    @property
+    def rating(self) -> int:
+        # every wrong turn a player is offered makes each of the moves that much harder to find
+        return round(self.distance * (1 + self.dead_ends))
+
+    def __repr__(self) -> str:
+        return (f"difficulty.Difficulty(rating={self.rating}, distance={self.distance}, "
+                f"branching={self.branching:.2f}, dead_ends={self.dead_ends:.2f})")
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def analyse(start: solver.Board, solution: solver.Board, max_states: Optional[int]=None) -> Optional[Difficulty]:
+    """
+    :param start: the board the player starts with
+    :param solution: the board to reach
+    :param max_states: give up after finding this many boards
+    :return: Difficulty or None if solution can not be reached
+    """
+    assert solver.board_shape(start) == solver.board_shape(solution), \
+        f"board shape {solver.board_shape(start)} != {solver.board_shape(solution)}"
+    types = set(solver.board_types(start)) | set(solver.board_types(solution))
+    tables = bitboard.get_tables(*solver.board_shape(start), types)
+    start_state = solver.to_state(start, tables)
+    goal_state = solver.to_state(solution, tables)
+    if not solver.same_blocks(tables, start_state, goal_state):
+        return None
+
+    # every layer before the one of the start is whole, so every board closer than it is in distances
+    layers = generator.layers_from(tables, goal_state, None, float("inf"), max_states, until=start_state)
+    distances = {state: distance for distance, layer in enumerate(layers) for state in layer}
+    if start_state not in distances:
+        return None
+
+    neighbours = tables.neighbours
+    distance = distances[start_state]
+    layer = {start_state}
+    boards = moves = dead_ends = 0
+    for closer in range(distance - 1, -1, -1):
+        next_layer = set()
+        for state in layer:
+            boards += 1
+            for new_state in neighbours(state):
+                moves += 1
+                if distances.get(new_state) == closer:
+                    next_layer.add(new_state)
+                else:
+                    dead_ends += 1
+        layer = next_layer
+
+    return Difficulty(distance, moves / max(boards, 1), dead_ends / max(moves, 1))
+
+
+def analyse_record(task: Tuple[int, np.ndarray, np.ndarray]) -> Tuple[int, Optional[Difficulty]]:
+    record, start, solution = task
+    return record, analyse(start, solution)
+
+
+class DifficultyIndex:
+    def __init__(self, entries: np.ndarray, puzzles: Optional[corpus.Corpus]=None) -> None:
+        """
+        :param entries: INDEX_DTYPE sorted by the rating
+        :param puzzles: the corpus the entries point into
+        """
+        self.entries: np.ndarray = entries
+        self.puzzles: Optional[corpus.Corpus] = puzzles
+
+    @staticmethod
+    def path_for(corpus_path: Union[Path, str]) -> Path:
+        return Path(corpus_path).with_suffix(".difficulty.npy")
+
+    @staticmethod
+    def build(puzzles: corpus.Corpus, workers: int=1) -> "DifficultyIndex":
+        """
+        analyses every puzzle of the corpus, the ones whose solution can not be reached are left out
+        :param puzzles: corpus.Corpus
+        :param workers: processes to analyse with
+        :return: DifficultyIndex
+        """
+        tasks = ((record, puzzle.start, puzzle.solution) for record, puzzle in enumerate(puzzles))
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                results = list(pool.imap(analyse_record, tasks, chunksize=16))
+        else:
+            results = [analyse_record(task) for task in tasks]
+
+        entries = np.array([
+            (found.rating, found.distance, found.branching, found.dead_ends, record)
+            for record, found in results if found is not None
+        ], dtype=INDEX_DTYPE)
+        return DifficultyIndex(entries[np.argsort(entries["rating"], kind="stable")], puzzles)
+
+    @staticmethod
+    def load(path: Union[Path, str], puzzles: Optional[corpus.Corpus]=None) -> "DifficultyIndex":
+        return DifficultyIndex(np.load(path, mmap_mode="r"), puzzles)
+
+    def save(self, path: Union[Path, str]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def ratings(self) -> Tuple[int, int]:
+        """
+        :return: the lowest and the highest rating in the index
+        """
+        assert len(self), "the index is empty"
+        return int(self.entries["rating"][0]), int(self.entries["rating"][-1])
+
+    def find(self, rating: int) -> Tuple[int, int]:
+        """
+        the entries with the rating closest to rating
+        :param rating: int
+        :return: the first entry and one after the last one
+        """
+        assert len(self), "the index is empty"
+        ratings = self.entries["rating"]
+        index = int(np.searchsorted(ratings, rating))
+        if index == len(ratings) or (index and rating - int(ratings[index - 1]) < int(ratings[index]) - rating):
+            index -= 1
+        closest = ratings[index]
+        return int(np.searchsorted(ratings, closest)), int(np.searchsorted(ratings, closest, side="right"))
+
+    def pick(self, rating: int) -> np.ndarray:
+        """
+        :param rating: int
+        :return: a random entry of the rating closest to rating
+        """
+        first, last = self.find(rating)
+        return self.entries[random.randrange(first, last)]
+
+    def puzzle(self, rating: int) -> generator.Puzzle:
+        assert self.puzzles is not None, "the index was made without its corpus"
+        return self.puzzles[int(self.pick(rating)["record"])]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="rate every puzzle of a corpus and index them by difficulty")
+    parser.add_argument("--corpus", type=Path, required=True)
+    parser.add_argument("--out", type=Path, default=None, help="defaults to the corpus path with .difficulty.npy")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    puzzles = corpus.Corpus(args.corpus)
+    index = DifficultyIndex.build(puzzles, args.workers)
+    path = args.out if args.out is not None else DifficultyIndex.path_for(args.corpus)
+    index.save(path)
+
+    print(f"indexed {len(index)}/{len(puzzles)} puzzles into {path} in {time.perf_counter() - start_time:.1f}s")
+    if len(index):
+        lowest, highest = index.ratings()
+        counts = np.bincount(index.entries["rating"])
+        for rating in range(lowest, highest + 1):
+            if counts[rating]:
+                print(f"rating {rating:3}: {counts[rating]} puzzles")
+
+
+if __name__ == "__main__":
+    main()
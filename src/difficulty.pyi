@@ -0,0 +1,55 @@
+from typing import Optional, Union, Tuple
+
+from pathlib import Path
+
+import src.solver as solver
+import src.corpus as corpus
+import src.generator as generator
+
+import numpy as np
+
+
+INDEX_DTYPE: np.dtype
+
+
+class Difficulty:
+    distance: int
+    branching: float
+    dead_ends: float
+
+    def __init__(self, distance: int, branching: float, dead_ends: float) -> None: ...
+    # the distance weighted by the dead ends
+    @property
+    def rating(self) -> int: ...
+    def __repr__(self) -> str: ...
+    def __str__(self) -> str: ...
+
+
+# None if solution can not be reached
+def analyse(start: solver.Board, solution: solver.Board, max_states: Optional[int]=None) -> Optional[Difficulty]: ...
+# (record, start, solution) -> (record, analyse(start, solution))
+def analyse_record(task: Tuple[int, np.ndarray, np.ndarray]) -> Tuple[int, Optional[Difficulty]]: ...
+
+
+class DifficultyIndex:
+    entries: np.ndarray
+    puzzles: Optional[corpus.Corpus]
+
+    def __init__(self, entries: np.ndarray, puzzles: Optional[corpus.Corpus]=None) -> None: ...
+    @staticmethod
+    def path_for(corpus_path: Union[Path, str]) -> Path: ...
+    @staticmethod
+    def build(puzzles: corpus.Corpus, workers: int=...) -> DifficultyIndex: ...
+    @staticmethod
+    def load(path: Union[Path, str], puzzles: Optional[corpus.Corpus]=None) -> DifficultyIndex: ...
+    def save(self, path: Union[Path, str]) -> None: ...
+    def __len__(self) -> int: ...
+    # the lowest and the highest rating
+    def ratings(self) -> Tuple[int, int]: ...
+    # the range of entries with the rating closest to rating
+    def find(self, rating: int) -> Tuple[int, int]: ...
+    def pick(self, rating: int) -> np.ndarray: ...
+    def puzzle(self, rating: int) -> generator.Puzzle: ...
+
+
+def main() -> None: ...
@@ -1,16 +1,18 @@
-from typing import List, Tuple, Union, Optional, Dict
+from typing import List, Tuple, Union, Optional, Callable
 
 import src.config as cfg
 
 import src.colors as colors
+import src.utils as utils
 import src.button as button
 import src.grid as grid
 import src.mouse as mouse
 import src.solution as solution
+import src.generator as generator
+import src.prefetch as prefetch
+import src.hints as hints
+import src.journal as journal
 
-import numpy as np
-
-import random
 import pygame
 import time
 import math
@@ -42,53 +44,101 @@ class Game:
         self.grid: grid.Grid = grid.Grid()
         self.solution: solution.Solution = solution.Solution()
 
+        # the map of the current puzzle is built in the background as soon as it is set
+        self.hints: Optional[hints.HintEngine] = None
+        # the move shown and the grid key it was for, it goes away once the grid changes
+        self.hint: Optional[Tuple[int, int, int]] = None
+        self.hint_key: Optional[int] = None
+
+        # every move of the current puzzle, undo and redo go through it
+        self.journal: Optional[journal.Journal] = None
+
+        # new puzzles are made in the background so reset does not have to wait for one
+        self.puzzles: prefetch.PuzzleQueue = prefetch.PuzzleQueue(generator.gen_random_counts)
         self.generate_grids()
+        self.puzzles.start()
 
         self.start_time: float = time.time()
 
-    def generate_grids(self) -> None:
+        # set while the win banner is up
+        self.won_time: Optional[float] = None
 
-        counts = self.gen_random_counts()
+        # everything gets drawn on the first frame, after that only what changed
+        self.redraw_all: bool = True
+        self.timer_text: Optional[str] = None
+        self.timer_rect: Optional[pygame.Rect] = None
 
-        self.solution.random_gen(counts)
-        self.grid.random_gen(counts)
+    def generate_grids(self, puzzle: Optional[generator.Puzzle]=None) -> None:
 
-    @staticmethod
-    def gen_random_counts() -> Dict[int, int]:
-        total_blocks = 11
-        b_1x1 = random.randrange(3, 6)
-        total_blocks -= b_1x1
-        b_2x1 = int(random.randrange(0, int(total_blocks // 2)) // 2)
-        total_blocks -= b_2x1 * 2
-        b_1x2 = int(total_blocks // 2)
+        if puzzle is None:
+            puzzle = self.puzzles.get()
 
-        return {
-            grid.Blocks.BLOCK_1x1: b_1x1,
-            grid.Blocks.BLOCK_2x1: b_2x1,
-            grid.Blocks.BLOCK_1x2: b_1x2,
-            grid.Blocks.BLOCK_2x2: 1
-        }
+        self.solution.set(puzzle.solution)
+        self.grid.set(puzzle.start)
+        self.grid.set_target(puzzle.solution)
 
-    def reset(self) -> None:
-        self.generate_grids()
+        if self.hints is not None:
+            self.hints.stop()
+        self.hints = hints.HintEngine(puzzle.solution)
+        self.hints.start()
+        self.hint = None
+
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = journal.Journal(puzzle.start, puzzle.solution, journal.Journal.new_path() if cfg.RECORD_JOURNALS else None)
+
+    def reset(self, puzzle: Optional[generator.Puzzle]=None) -> None:
+        self.generate_grids(puzzle)
         self.start_time = time.time()
+        self.redraw_all = True
 
     def won(self) -> None:
+        self.won_time = time.time()
+        self.click_pos = None
+        self.grid_pos = None
+        self.true_block_pos = None
+        # a full frame gets drawn with the banner on top
+        self.redraw_all = True
+
+    def draw_won(self) -> None:
         font = cfg.get_font(None, 50)
-        text = font.render("You Won!", True, colors.black)
+        text = utils.render_text(font, "You Won!", True, colors.black)
         text_rect = text.get_rect()
         text_rect.center = (self.W / 2, self.H / 2)
 
-        self.draw()
         self.WIN.blit(text, text_rect)
-        pygame.display.update()
-        pygame.time.delay(3000)
-
-        self.reset()
 
     def update(self) -> None:
-        if np.array_equal(self.grid.get_grid(), self.solution.get_grid()):
-            self.won()
+        if self.won_time is not None:
+            if time.time() - self.won_time >= cfg.WIN_BANNER_TIME:
+                self.won_time = None
+                self.reset()
+
+        if self.hint is not None and self.grid.key != self.hint_key:
+            self.hint = None
+            self.redraw_all = True
+
+    def show_hint(self) -> None:
+        # hint waits for the map, the frame can not, so there is no hint until it is built
+        if not self.hints.ready.is_set():
+            return
+        self.hint = self.hints.hint(self.grid)
+        self.hint_key = self.grid.key
+        self.redraw_all = True
+
+    def draw_hint(self) -> None:
+        row, col, direction = self.hint
+        rect = self.grid.block_rect(row, col, self.grid.at(row, col))
+        pygame.draw.rect(self.WIN, colors.orange, rect, 4)
+
+        # a bar along the side the block moves to
+        side = {
+            grid.Directions.RIGHT: (rect.right - 8, rect.top, 8, rect.height),
+            grid.Directions.LEFT: (rect.left, rect.top, 8, rect.height),
+            grid.Directions.UP: (rect.left, rect.top, rect.width, 8),
+            grid.Directions.DOWN: (rect.left, rect.bottom - 8, rect.width, 8),
+        }[direction]
+        pygame.draw.rect(self.WIN, colors.orange, side)
 
     def event_handler(self) -> None:
         events = pygame.event.get()
@@ -97,8 +147,24 @@ class Game:
 
         for event in events:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                self.puzzles.stop()
+                self.hints.stop()
+                self.journal.close()
                 pygame.quit()
                 sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.redraw_all = True
+            elif event.type == pygame.KEYDOWN and self.won_time is None and self.click_pos is None:
+                if event.key == pygame.K_h:
+                    self.show_hint()
+                elif event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL:
+                    self.step_journal(self.journal.redo if event.mod & pygame.KMOD_SHIFT else self.journal.undo)
+                elif event.key == pygame.K_y and event.mod & pygame.KMOD_CTRL:
+                    self.step_journal(self.journal.redo)
+
+        # nothing can be moved while the win banner is up
+        if self.won_time is not None:
+            return
 
         if self.mouse.just_pressed_left:
             if self.mouse.y > cfg.UTIL_BAR_HEIGHT:
@@ -128,47 +194,89 @@ class Game:
             if self.grid_pos == new_grid_pos:
                 return
 
-            if self.grid_pos.col < new_grid_pos.col < cfg.GRID_COLS:
-                if self.grid.move_right(self.true_block_pos.row, self.true_block_pos.col):
-                    self.true_block_pos.col += 1
+            # the block slides the whole way to the cursor at once so a fast drag does not lag
+            if self.grid_pos.col < new_grid_pos.col < self.grid.cols:
+                self.slide_block(grid.Directions.RIGHT, new_grid_pos.col - self.grid_pos.col)
             elif -1 < new_grid_pos.col < self.grid_pos.col:
-                if self.grid.move_left(self.true_block_pos.row, self.true_block_pos.col):
-                    self.true_block_pos.col -= 1
+                self.slide_block(grid.Directions.LEFT, self.grid_pos.col - new_grid_pos.col)
 
-            if self.grid_pos.row < new_grid_pos.row < cfg.GRID_ROWS:
-                if self.grid.move_down(self.true_block_pos.row, self.true_block_pos.col):
-                    self.true_block_pos.row += 1
+            if self.grid_pos.row < new_grid_pos.row < self.grid.rows:
+                self.slide_block(grid.Directions.DOWN, new_grid_pos.row - self.grid_pos.row)
             elif -1 < new_grid_pos.row < self.grid_pos.row:
-                if self.grid.move_up(self.true_block_pos.row, self.true_block_pos.col):
-                    self.true_block_pos.row -= 1
+                self.slide_block(grid.Directions.UP, self.grid_pos.row - new_grid_pos.row)
 
             self.grid_pos = new_grid_pos
 
-    def draw(self) -> None:
-        self.WIN.fill((30, 30, 30))
+            # only a move can solve the puzzle
+            if self.grid.solved():
+                self.won()
 
-        pygame.draw.rect(self.WIN, colors.grey9, [0, 0, cfg.WIDTH, cfg.UTIL_BAR_HEIGHT])
+    def step_journal(self, step: Callable[[grid.Grid], Optional[Tuple[int, int, int]]]) -> None:
+        # an undo can take the board back to the solution as well
+        if step(self.grid) is not None and self.grid.solved():
+            self.won()
 
-        self.reset_button.draw_to(self.WIN, colors.red)
+    def slide_block(self, direction: int, steps: int) -> None:
+        reached = self.journal.slide(self.grid, self.true_block_pos.row, self.true_block_pos.col, direction, steps)
+        if reached:
+            self.true_block_pos = reached[-1]
 
-        time_since_start_in_s = time.time() - self.start_time
+    def draw_timer(self) -> List[pygame.Rect]:
+        # the timer stops when the puzzle is solved
+        time_since_start_in_s = (self.won_time or time.time()) - self.start_time
 
         minutes = int(time_since_start_in_s // 60)
         seconds = int(time_since_start_in_s % 60)
+        if f"{minutes}:{seconds}" == self.timer_text:
+            return []
+        self.timer_text = f"{minutes}:{seconds}"
+
         time_font = cfg.get_font(None, 40)
-        time_text = time_font.render(f"{minutes}:{seconds}", True, colors.black)
+        time_text = utils.render_text(time_font, self.timer_text, True, colors.black)
 
         time_text_rect = time_text.get_rect()
         time_text_rect.centerx = cfg.WIDTH / 2
         time_text_rect.y = 5
 
-        pygame.draw.rect(self.WIN, colors.orange, [cfg.WIDTH / 2 - 60 / 2, 5, 60, time_text_rect.height])
+        box_rect = pygame.Rect(cfg.WIDTH / 2 - 60 / 2, 5, 60, time_text_rect.height)
+        # the old text can stick out of the box further than the new one
+        dirty_rect = box_rect.union(time_text_rect).union(self.timer_rect or box_rect)
+        self.timer_rect = time_text_rect
+
+        pygame.draw.rect(self.WIN, colors.grey9, dirty_rect)
+        pygame.draw.rect(self.WIN, colors.orange, box_rect)
         self.WIN.blit(time_text, time_text_rect)
 
+        return [dirty_rect]
+
+    def draw(self) -> None:
+        if not self.redraw_all:
+            dirty_rects = self.draw_timer() + self.solution.draw_dirty_to(self.WIN) + self.grid.draw_dirty_to(self.WIN)
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            return
+
+        self.WIN.fill((30, 30, 30))
+
+        pygame.draw.rect(self.WIN, colors.grey9, [0, 0, cfg.WIDTH, cfg.UTIL_BAR_HEIGHT])
+
+        self.reset_button.draw_to(self.WIN, colors.red)
+
+        self.timer_text = None
+        self.timer_rect = None
+        self.draw_timer()
+
         self.solution.draw_to(self.WIN)
         self.grid.draw_to(self.WIN)
 
+        if self.hint is not None:
+            self.draw_hint()
+
+        if self.won_time is not None:
+            self.draw_won()
+
         pygame.display.update()
+        self.redraw_all = False
 
     def run(self) -> None:
         while self.running:
@@ -0,0 +1,145 @@
+"""
+makes puzzles that can always be solved
+
+the solution is placed at random and the starting board is picked from a bfs that
+walks backwards from it, every move can be undone so anything the bfs reaches can
+be turned back into the solution, and the layer a board is found in is exactly the
+least number of moves it needs
+"""
+
+from typing import List, Dict, Optional
+
+import src.config as cfg
+import src.grid as grid
+import src.bitboard as bitboard
+
+import numpy as np
+
+import random
+import time
+
+
+class Puzzle:
+    def __init__(self, start: np.ndarray, solution: np.ndarray, distance: int) -> None:
+        self.start: np.ndarray = start
+        self.solution: np.ndarray = solution
+        self.distance: int = distance
+
+    def __repr__(self) -> str:
+        return f"generator.Puzzle(distance={self.distance})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def gen_random_counts() -> Dict[int, int]:
+    total_blocks = 11
+    b_1x1 = random.randrange(3, 6)
+    total_blocks -= b_1x1
+    b_2x1 = int(random.randrange(0, int(total_blocks // 2)) // 2)
+    total_blocks -= b_2x1 * 2
+    b_1x2 = int(total_blocks // 2)
+
+    return {
+        grid.Blocks.BLOCK_1x1: b_1x1,
+        grid.Blocks.BLOCK_2x1: b_2x1,
+        grid.Blocks.BLOCK_1x2: b_1x2,
+        grid.Blocks.BLOCK_2x2: 1
+    }
+
+
+def possible_counts() -> List[Dict[int, int]]:
+    """
+    every result gen_random_counts can give
+    :return: List[Dict[int, int]]
+    """
+    result = []
+    for b_1x1 in range(3, 6):
+        total_blocks = 11 - b_1x1
+        for b_2x1 in sorted({int(choice // 2) for choice in range(0, int(total_blocks // 2))}):
+            b_1x2 = int((total_blocks - b_2x1 * 2) // 2)
+            result.append({
+                grid.Blocks.BLOCK_1x1: b_1x1,
+                grid.Blocks.BLOCK_2x1: b_2x1,
+                grid.Blocks.BLOCK_1x2: b_1x2,
+                grid.Blocks.BLOCK_2x2: 1
+            })
+    return result
+
+
+def layers_from(
+        tables: bitboard.Tables,
+        state: int,
+        max_distance: Optional[int],
+        deadline: float,
+        max_states: Optional[int]=None,
+        until: Optional[int]=None
+) -> List[List[int]]:
+    """
+    the boards reachable from state grouped by how many moves away they are
+    :param tables: bitboard.Tables
+    :param state: int
+    :param max_distance: the last layer to look at, None for no limit
+    :param deadline: a time.perf_counter() value after which the bfs stops
+    :param max_states: stop after finding this many boards
+    :param until: stop once the layer holding this board is done
+    :return: layer n holds boards exactly n moves away
+    """
+    seen = {state}
+    layers = [[state]]
+    neighbours = tables.neighbours
+
+    while (max_distance is None or len(layers) <= max_distance) and layers[-1] and until not in seen:
+        next_layer = []
+        for current in layers[-1]:
+            for new_state in neighbours(current):
+                if new_state not in seen:
+                    seen.add(new_state)
+                    next_layer.append(new_state)
+            if time.perf_counter() > deadline or (max_states is not None and len(seen) > max_states):
+                break
+        if not next_layer:
+            break
+        layers.append(next_layer)
+        if time.perf_counter() > deadline or (max_states is not None and len(seen) > max_states):
+            break
+
+    return layers
+
+
+def generate(
+        counts: Dict[int, int],
+        min_distance: int=cfg.MIN_SOLUTION_DISTANCE,
+        max_distance: int=cfg.MAX_SOLUTION_DISTANCE,
+        time_budget: float=cfg.GENERATION_TIME_BUDGET,
+        rows: int=cfg.GRID_ROWS,
+        cols: int=cfg.GRID_COLS,
+        max_states: Optional[int]=None
+) -> Puzzle:
+    """
+    a puzzle whose start is a random distance between min_distance and max_distance moves
+    away from its solution, if the time runs out or the boards can not get that far apart
+    it falls back to the farthest board it found so the puzzle can always be solved
+    :param counts: a pair of Blocks.BLOCK_* and the count of each one
+    :param min_distance: int
+    :param max_distance: int
+    :param time_budget: seconds the search may take
+    :param rows: int
+    :param cols: int
+    :param max_states: how many boards the search may find, unlike the time budget the
+                       same seed then always gives the same puzzle
+    :return: Puzzle
+    """
+    deadline = time.perf_counter() + time_budget
+
+    solution = bitboard.BitGrid(rows, cols, grid.Blocks.types_for(counts))
+    solution.random_gen(counts)
+    tables = solution.tables
+
+    # the bfs only has to go as deep as the distance that gets picked
+    layers = layers_from(tables, solution.state, random.randint(min_distance, max_distance), deadline, max_states)
+
+    distance = len(layers) - 1
+    start = random.choice(layers[distance])
+
+    return Puzzle(tables.to_array(start), solution.get_grid(), distance)
@@ -0,0 +1,39 @@
+from typing import List, Dict, Optional
+
+import src.bitboard as bitboard
+
+import numpy as np
+
+
+class Puzzle:
+    start: np.ndarray
+    solution: np.ndarray
+    distance: int
+
+    def __init__(self, start: np.ndarray, solution: np.ndarray, distance: int) -> None: ...
+    def __repr__(self) -> str: ...
+    def __str__(self) -> str: ...
+
+
+def gen_random_counts() -> Dict[int, int]: ...
+# every result gen_random_counts can give
+def possible_counts() -> List[Dict[int, int]]: ...
+# layer n holds the boards exactly n moves away from state
+def layers_from(
+        tables: bitboard.Tables,
+        state: int,
+        max_distance: Optional[int],
+        deadline: float,
+        max_states: Optional[int]=None,
+        until: Optional[int]=None
+) -> List[List[int]]: ...
+# a pair of Blocks.BLOCK_* and the count of each one
+def generate(
+        counts: Dict[int, int],
+        min_distance: int=...,
+        max_distance: int=...,
+        time_budget: float=...,
+        rows: int=...,
+        cols: int=...,
+        max_states: Optional[int]=None
+) -> Puzzle: ...
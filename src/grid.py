@@ -18,16 +18,17 @@ but this is not valid as it says there are four 2x2 blocks
  [0, 0, 1, 1]]
 """
 
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Union, Tuple, Iterable
 
 import src.config as cfg
+import src.colors as colors
 import src.utils as utils
 import src.mouse as mouse
+import src.bitboard as bitboard
 
 import numpy as np
 
-import random
-
+import functools
 import pygame
 
 
@@ -37,16 +38,151 @@ class Blocks:
     BLOCK_2x1: int = 2
     BLOCK_1x2: int = 3
     BLOCK_2x2: int = 4
+    # the L pieces are a 2x2 block missing one cell and are named after the cell in the corner of the L
+    BLOCK_L_TOPLEFT: int = 5
+    BLOCK_L_TOPRIGHT: int = 6
+    BLOCK_L_BOTTOMLEFT: int = 7
+    BLOCK_L_BOTTOMRIGHT: int = 8
+    # what block_at gives for cells off the board
+    BLOCK_WALL: int = 255
+
+    # the cells every block type covers as (row, col) from its anchor, the anchor is the
+    # first cell of the block going row by row so no two blocks can ever share one
+    SHAPES: Dict[int, Tuple[Tuple[int, int], ...]] = {
+        BLOCK_1x1: ((0, 0),),
+        BLOCK_2x1: ((0, 0), (0, 1)),
+        BLOCK_1x2: ((0, 0), (1, 0)),
+        BLOCK_2x2: ((0, 0), (0, 1), (1, 0), (1, 1)),
+        BLOCK_L_TOPLEFT: ((0, 0), (0, 1), (1, 0)),
+        BLOCK_L_TOPRIGHT: ((0, 0), (0, 1), (1, 1)),
+        BLOCK_L_BOTTOMLEFT: ((0, 0), (1, 0), (1, 1)),
+        BLOCK_L_BOTTOMRIGHT: ((0, 0), (1, -1), (1, 0)),
+    }
+
+    # the (rows, cols) of the box around each shape
+    SIZE: Dict[int, Tuple[int, int]] = {}
+    # the column of the left of that box from the anchor
+    LEFT: Dict[int, int] = {}
+
+    # the block types a board has unless it is given others
+    CLASSIC: Tuple[int, ...] = (BLOCK_1x1, BLOCK_2x1, BLOCK_1x2, BLOCK_2x2)
 
     CODE: Dict[int, pygame.Surface] = {}
 
+    @classmethod
+    def register(cls, typ: int, cells: List[Tuple[int, int]]) -> None:
+        """
+        adds a block type, boards only use it when it is in their types
+        :param typ: the value the grid holds at the anchor, has to fit in a np.uint8
+        :param cells: the (row, col) of every cell of the shape
+        """
+        assert 0 < typ < cls.BLOCK_WALL, f"block type {typ} does not fit in the grid"
+        assert typ not in cls.SHAPES, f"block type {typ} already exists"
+
+        first_row, first_col = min(cells)
+        cls.SHAPES[typ] = tuple(sorted((row - first_row, col - first_col) for row, col in set(cells)))
+        cls.measure(typ)
+
+    @classmethod
+    def measure(cls, typ: int) -> None:
+        shape = cls.SHAPES[typ]
+        cls.SIZE[typ] = (
+            max(row for row, _ in shape) + 1,
+            max(col for _, col in shape) - min(col for _, col in shape) + 1,
+        )
+        cls.LEFT[typ] = min(col for _, col in shape)
+
+    @classmethod
+    def types_for(cls, values: Iterable[int]) -> Tuple[int, ...]:
+        """
+        the classic types and every other one in values, enough to hold a board or a count
+        :param values: block types, 0 is skipped
+        :return: sorted block types
+        """
+        return tuple(sorted(set(cls.CLASSIC) | {int(value) for value in values if value}))
+
+    @staticmethod
+    def probes(typ: int, d_row: int, d_col: int) -> List[Tuple[int, int]]:
+        """
+        the cells a block moves into when its anchor moves by d_row-d_col
+        :return: (row, col) from the anchor before the move
+        """
+        shape = set(Blocks.SHAPES[typ])
+        return sorted({(row + d_row, col + d_col) for row, col in shape} - shape)
+
+    @staticmethod
+    def mirror(typ: int) -> Optional[int]:
+        """
+        :return: the type whose shape is typ flipped left to right, None if there is none
+        """
+        flipped = [(row, -col) for row, col in Blocks.SHAPES[typ]]
+        first_row, first_col = min(flipped)
+        flipped = tuple(sorted((row - first_row, col - first_col) for row, col in flipped))
+        for other, shape in Blocks.SHAPES.items():
+            if shape == flipped:
+                return other
+        return None
+
+    @staticmethod
+    def render(typ: int, cell_size: int, color: Tuple[int, int, int], border: int=0) -> pygame.Surface:
+        """
+        draws a shape that has no image, the cells are joined over the 1px lines between them
+        :param typ: Blocks.BLOCK_*
+        :param cell_size: the size of a cell in pixels
+        :param color: the fill color
+        :param border: how thick the black edge around the shape is
+        :return: a surface the size of the box around the shape, black is transparent outside of it
+        """
+        rows, cols = Blocks.SIZE[typ]
+        left = Blocks.LEFT[typ]
+        surface = pygame.Surface((cols * cell_size + cols - 1, rows * cell_size + rows - 1))
+        surface.fill((1, 1, 1))
+        surface.set_colorkey((1, 1, 1))
+
+        shape = set(Blocks.SHAPES[typ])
+        for row, col in shape:
+            x = (col - left) * (cell_size + 1)
+            y = row * (cell_size + 1)
+            # a cell and the line after it when the shape goes on past it
+            width = cell_size + ((row, col + 1) in shape)
+            height = cell_size + ((row + 1, col) in shape)
+            pygame.draw.rect(surface, (0, 0, 0), (x, y, width, height))
+        for row, col in shape:
+            x = (col - left) * (cell_size + 1) + border
+            y = row * (cell_size + 1) + border
+            width = cell_size - 2 * border + ((row, col + 1) in shape) * (2 * border + 1)
+            height = cell_size - 2 * border + ((row + 1, col) in shape) * (2 * border + 1)
+            pygame.draw.rect(surface, color, (x, y, width, height))
+
+        return surface
+
     @classmethod
     def load(cls) -> None:
+        if cls.CODE:
+            return
         cls.CODE[cls.BLOCK_1x1] = utils.load_image(cfg.Paths.ASSETS / "1x1sq.png")
         cls.CODE[cls.BLOCK_2x1] = pygame.image.load(cfg.Paths.ASSETS / "2x1sq.png")
         cls.CODE[cls.BLOCK_1x2] = pygame.image.load(cfg.Paths.ASSETS / "1x2sq.png")
         cls.CODE[cls.BLOCK_2x2] = pygame.image.load(cfg.Paths.ASSETS / "2x2sq.png")
 
+    @classmethod
+    def image(cls, typ: int) -> pygame.Surface:
+        cls.load()
+        if typ not in cls.CODE:
+            cls.CODE[typ] = cls.render(typ, int(cfg.TILE_SIZE.x), colors.green3, 4)
+        return cls.CODE[typ]
+
+
+for _typ in Blocks.SHAPES:
+    Blocks.measure(_typ)
+
+
+class Directions:
+    RIGHT: int = 0
+    LEFT: int = 1
+    UP: int = 2
+    DOWN: int = 3
+
 
 class GridVector:
     def __init__(self, row: int=0, col: int=0) -> None:
@@ -70,23 +206,149 @@ class GridVector:
         return self.row == other.row and self.col == other.col
 
 
+@functools.lru_cache(maxsize=None)
+def shape_tables(types: Tuple[int, ...]) -> Tuple[List[Tuple[int, int, int]], Dict[int, List[List[Tuple[int, int]]]]]:
+    """
+    what Grid needs to move blocks of any shape, the same for every board size
+    :param types: sorted Blocks.BLOCK_*
+    :return: (typ, row, col) for every cell of every shape, the block covering a cell has its
+             anchor at the cell minus one of these, and typ -> direction -> the cells from the
+             anchor the block moves into
+    """
+    cover = [(typ, row, col) for typ in types for row, col in Blocks.SHAPES[typ]]
+    probes = {typ: [[], [], [], []] for typ in types}
+    for typ in types:
+        for direction, (d_row, d_col) in ((Directions.RIGHT, (0, 1)), (Directions.LEFT, (0, -1)), (Directions.UP, (-1, 0)), (Directions.DOWN, (1, 0))):
+            probes[typ][direction] = Blocks.probes(typ, d_row, d_col)
+    return cover, probes
+
+
 class Grid:
-    def __init__(self) -> None:
-        self.rows: int = cfg.GRID_ROWS
-        self.cols: int = cfg.GRID_COLS
+    # the empty board for every (rows, cols, cell_size), loaded or drawn once one gets drawn,
+    # so grids used for the logic alone never need an image or a display
+    _grid_surfaces: Dict[Tuple[int, int, int], pygame.Surface] = {}
+    # the background with the blocks already on it for the last few grids drawn
+    _composites: utils.SurfaceCache = utils.SurfaceCache(cfg.BOARD_CACHE_SIZE)
+
+    def __init__(self, rows: int=cfg.GRID_ROWS, cols: int=cfg.GRID_COLS, types: Iterable[int]=Blocks.CLASSIC) -> None:
+        """
+        :param rows: int
+        :param cols: int
+        :param types: the Blocks.BLOCK_* the grid can hold
+        """
+        self.rows: int = rows
+        self.cols: int = cols
+        self.types: Tuple[int, ...] = tuple(sorted(types))
 
         self.cell_size: int = cfg.TILE_SIZE.x
 
         self._grid: np.ndarray = np.zeros(
-            (cfg.GRID_ROWS, cfg.GRID_COLS),
+            (rows, cols),
             dtype=np.uint8,
         )
+        # what the grid looked like the last time it was drawn
+        self._drawn: Optional[np.ndarray] = None
+
+        self.tables: bitboard.Tables = bitboard.get_tables(rows, cols, self.types)
+        self._cover, self._probes = shape_tables(self.types)
+
+        # the grid to reach and how many of its cells already match, kept up to date by every write
+        self._target: Optional[List[List[int]]] = None
+        self.matching: int = 0
+
+        # identities of the current grid that every write updates without allocating
+        # key has bitboard.Tables.bits_per_cell bits for the value of every cell, the same
+        # as bitboard.Tables.pack, zobrist is the xor of Tables.zobrist for every cell and
+        # state is the grid as a bitboard state so the tables can be used on it as it is
+        self.key: int = 0
+        self.zobrist: int = 0
+        self.state: int = 0
+
+    @property
+    def grid_surface(self) -> pygame.Surface:
+        size = (self.rows, self.cols, self.cell_size)
+        if size not in Grid._grid_surfaces:
+            if size == (cfg.GRID_ROWS, cfg.GRID_COLS, cfg.TILE_SIZE.x):
+                Grid._grid_surfaces[size] = utils.load_image(cfg.Paths.ASSETS / "playinggrid.png")
+            else:
+                Grid._grid_surfaces[size] = utils.draw_board(self.rows, self.cols, self.cell_size, (107, 105, 107), (30, 30, 30))
+        return Grid._grid_surfaces[size]
+
+    def set(self, grid: Union[np.ndarray, List[List[int]]], copy: bool=True) -> None:
+        """
+        :param grid: the new grid
+        :param copy: if False a uint8 np.ndarray is used as is, moves then write into it
+        """
+        array = np.asarray(grid, dtype=np.uint8)
+        assert array.shape == self._grid.shape, f"grid shape {array.shape} != {self._grid.shape}"
+        self._grid = array.copy() if copy else array
+        self._refresh()
+
+    def set_target(self, target: Optional[Union[np.ndarray, List[List[int]]]]) -> None:
+        """
+        :param target: the grid solved() compares against, None to stop tracking
+        """
+        if target is None:
+            self._target = None
+        else:
+            array = np.asarray(target, dtype=np.uint8)
+            assert array.shape == self._grid.shape, f"target shape {array.shape} != {self._grid.shape}"
+            self._target = array.tolist()
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """
+        works out everything _write keeps up to date from scratch
+        """
+        if self._target is None:
+            self.matching = 0
+        else:
+            self.matching = int(np.count_nonzero(self._grid == np.array(self._target, dtype=np.uint8)))
+
+        self.key = 0
+        self.zobrist = 0
+        self.state = 0
+        bits = self.tables.bits_per_cell
+        for cell, value in enumerate(self._grid.ravel().tolist()):
+            self.key |= value << (cell * bits)
+            self.zobrist ^= self.tables.zobrist[cell][value]
+            self.state ^= self._state_bits(value, cell)
+
+    def solved(self) -> bool:
+        return self._target is not None and self.matching == self.rows * self.cols
+
+    def canonical_key(self) -> int:
+        """
+        key of the grid or of its mirror image, whichever is smaller, so a board and its
+        mirror image share one entry in anything keyed by it
+        """
+        return self.tables.pack(self.tables.canonical(self.state))
+
+    def _state_bits(self, typ: int, cell: int) -> int:
+        """
+        :return: the bits of the state a block of typ anchored at cell sets, nothing for a type the tables do not have
+        """
+        footprint = self.tables.footprint.get(typ)
+        if footprint is None:
+            return 0
+        return footprint[cell] | 1 << (typ * self.tables.cells + cell)
+
+    def _write(self, row: int, col: int, value: int) -> None:
+        """
+        every cell change goes through here so the counts and keys that follow the grid stay right
+        """
+        old = int(self._grid[row, col])
+        if self._target is not None:
+            target = self._target[row][col]
+            self.matching += (value == target) - (old == target)
 
-        self.grid_surface: pygame.Surface = utils.load_image(cfg.Paths.ASSETS / "playinggrid.png")
+        cell = row * self.cols + col
+        self.key ^= (old ^ value) << (cell * self.tables.bits_per_cell)
+        zobrist = self.tables.zobrist[cell]
+        self.zobrist ^= zobrist[old] ^ zobrist[value]
+        self.state ^= self._state_bits(old, cell) ^ self._state_bits(value, cell)
 
-    def set(self, grid: Union[np.ndarray, List[List[int]]]) -> None:
-        assert np.array(grid).shape == self._grid.shape, f"grid shape {np.array(grid).shape} != {self._grid.shape}"
-        self._grid = np.array(grid, dtype=np.uint8)
+        self._grid[row, col] = value
 
     def tobytes(self) -> bytes:
         return self._grid.tobytes()
@@ -102,56 +364,21 @@ class Grid:
             return 0
         return self._grid[row, col]
 
-    def random_gen(self, counts: Dict[int, int]) -> None:
-        selection = []
-        for value, count in counts.items():
-            selection += [value] * count
-
-        selection_ = selection[:]
-
-        def get_random_choice() -> int:
-            if selection_:
-                choice = random.choice(selection_)
-                selection_.remove(choice)
-                return choice
-            return 0
-
-        def is_done() -> bool:
-            return not selection_
-
-        def put_back(value__: int) -> None:
-            selection_.append(value__)
-
-        while not is_done():
-            selection_ = selection[:]
-            self._grid.fill(0)
-            valid_places = [(row, col) for row in range(cfg.GRID_ROWS) for col in range(cfg.GRID_COLS)]
-            random.shuffle(valid_places)
-
-            for row, col in valid_places:
-                choice = get_random_choice()
-                if not self.set_at(row, col, choice) and choice:
-                    put_back(choice)
+    def random_gen(self, counts: Dict[int, int]) -> int:
+        assert set(counts) <= set(self.types), f"{counts} has blocks that are not in {self.types}"
+        state, attempts = self.tables.random_layout(counts)
+        self._grid = self.tables.to_array(state)
+        self._refresh()
+        return attempts
 
     def set_at(self, row: int, col: int, value: int) -> bool:
-        if self.if_block_at(row, col):
+        if value not in self.types:
             return False
-        if value == Blocks.BLOCK_1x1:
-            self._grid[row, col] = value
-            return True
-        elif value == Blocks.BLOCK_2x1 and not self.if_block_at(row, col + 1):
-            self._grid[row, col] = value
-            return True
-        elif value == Blocks.BLOCK_1x2 and not self.if_block_at(row + 1, col):
-            self._grid[row, col] = value
-            return True
-        elif value == Blocks.BLOCK_2x2 and\
-                not self.if_block_at(row, col + 1) and\
-                not self.if_block_at(row + 1, col) and\
-                not self.if_block_at(row + 1, col + 1):
-            self._grid[row, col] = value
-            return True
-        return False
+        for d_row, d_col in Blocks.SHAPES[value]:
+            if self.if_block_at(row + d_row, col + d_col):
+                return False
+        self._write(row, col, value)
+        return True
 
     def if_block_at(self, row: int, col: int) -> bool:
         return bool(self.block_at(row, col))
@@ -159,283 +386,149 @@ class Grid:
     def check_if_in_bounds(self, row: int, col: int) -> bool:
         return 0 <= row < self.rows and 0 <= col < self.cols
 
+    def _owner(self, row: int, col: int) -> Optional[Tuple[int, int, int]]:
+        """
+        :return: (typ, row, col) of the anchor of the block covering row-col, None if there is none
+        """
+        if not self.check_if_in_bounds(row, col):
+            return None
+        for typ, d_row, d_col in self._cover:
+            anchor_row, anchor_col = row - d_row, col - d_col
+            if 0 <= anchor_row < self.rows and 0 <= anchor_col < self.cols and self._grid[anchor_row, anchor_col] == typ:
+                return typ, anchor_row, anchor_col
+        return None
+
     def block_at(self, row: int, col: int) -> int:
         if not self.check_if_in_bounds(row, col):
-            return Blocks.BLOCK_2x2 * 2
-        if self.at(row, col) == Blocks.BLOCK_1x1:
-            return Blocks.BLOCK_1x1
-        if (self.check_if_in_bounds(row, col - 1) and self.at(row, col - 1) == Blocks.BLOCK_2x1) or \
-                self.at(row, col) == Blocks.BLOCK_2x1:
-            return Blocks.BLOCK_2x1
-        if (self.check_if_in_bounds(row - 1, col) and self.at(row - 1, col) == Blocks.BLOCK_1x2) or \
-                self.at(row, col) == Blocks.BLOCK_1x2:
-            return Blocks.BLOCK_1x2
-        if (self.check_if_in_bounds(row - 1, col - 1) and self.at(row - 1, col - 1) == Blocks.BLOCK_2x2) or \
-                self.at(row, col) == Blocks.BLOCK_2x2 or \
-                (self.check_if_in_bounds(row - 1, col) and self.at(row - 1, col) == Blocks.BLOCK_2x2) or \
-                (self.check_if_in_bounds(row, col - 1) and self.at(row, col - 1) == Blocks.BLOCK_2x2):
-            return Blocks.BLOCK_2x2
+            return Blocks.BLOCK_WALL
+        owner = self._owner(row, col)
+        return Blocks.BLOCK_NONE if owner is None else owner[0]
 
     def locate_block(self, row: int, col: int, typ: int) -> Optional[GridVector]:
-        if typ == Blocks.BLOCK_1x1 and self.at(row, col) == Blocks.BLOCK_1x1:
-            return GridVector(row, col)
-        elif typ == Blocks.BLOCK_2x1:
-            if self.at(row, col) == Blocks.BLOCK_2x1:
-                return GridVector(row, col)
-            elif self.check_if_in_bounds(row, col - 1) and self.at(row, col - 1) == Blocks.BLOCK_2x1:
-                return GridVector(row, col - 1)
-            else:
-                return None
-        elif typ == Blocks.BLOCK_1x2:
-            if self.at(row, col) == Blocks.BLOCK_1x2:
-                return GridVector(row, col)
-            elif self.check_if_in_bounds(row - 1, col) and self.at(row - 1, col) == Blocks.BLOCK_1x2:
-                return GridVector(row - 1, col)
-            else:
-                return None
-        elif typ == Blocks.BLOCK_2x2:
-            if self.at(row, col) == Blocks.BLOCK_2x2:
-                return GridVector(row, col)
-            elif self.check_if_in_bounds(row - 1, col) and self.at(row - 1, col) == Blocks.BLOCK_2x2:
-                return GridVector(row - 1, col)
-            elif self.check_if_in_bounds(row, col - 1) and self.at(row, col - 1) == Blocks.BLOCK_2x2:
-                return GridVector(row, col - 1)
-            elif self.check_if_in_bounds(row - 1, col - 1) and self.at(row - 1, col - 1) == Blocks.BLOCK_2x2:
-                return GridVector(row - 1, col - 1)
-            else:
-                return None
-        else:
+        owner = self._owner(row, col)
+        if owner is None or owner[0] != typ:
             return None
+        return GridVector(owner[1], owner[2])
 
     def move_right(self, row: int, col: int) -> bool:
-        cell = self.block_at(row, col)
-
-        if cell == 0:
-            return False
-
-        if cell == Blocks.BLOCK_1x1:
-            self._grid[row, col] = 0
-
-            if self.check_if_in_bounds(row, col + 1) and not self.if_block_at(row, col + 1):
-                self.set_at(row, col + 1, Blocks.BLOCK_1x1)
-                self._grid[row, col] = 0
-                return True
-
-            self._grid[row, col] = Blocks.BLOCK_1x1
-            return False
-        elif cell == Blocks.BLOCK_2x1:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x1)
-            if loc is None or loc.col == cfg.GRID_COLS - 2:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(row, col + 1) and not self.if_block_at(row, col + 2):
-                self._grid[row, col + 1] = Blocks.BLOCK_2x1
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x1
-            return False
-        elif cell == Blocks.BLOCK_1x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_1x2)
-            if loc is None or loc.col == cfg.GRID_COLS - 1:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row, loc.col + 1) and not self.if_block_at(loc.row + 1, loc.col + 1):
-                self._grid[loc.row, loc.col + 1] = Blocks.BLOCK_1x2
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_1x2
-            return False
-        elif cell == Blocks.BLOCK_2x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x2)
-            if loc is None or loc.col == cfg.GRID_COLS - 2:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row, loc.col + 2) and not self.if_block_at(loc.row + 1, loc.col + 2):
-                self._grid[loc.row, loc.col + 1] = Blocks.BLOCK_2x2
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x2
-            return False
-        else:
-            return False
+        return self.move(row, col, Directions.RIGHT)
 
     def move_left(self, row: int, col: int) -> bool:
-        cell = self.block_at(row, col)
-
-        if cell == 0:
-            return False
-
-        if cell == Blocks.BLOCK_1x1:
-            self._grid[row, col] = 0
-
-            if self.check_if_in_bounds(row, col - 1) and not self.if_block_at(row, col - 1):
-                self.set_at(row, col - 1, Blocks.BLOCK_1x1)
-                self._grid[row, col] = 0
-                return True
-
-            self._grid[row, col] = Blocks.BLOCK_1x1
-            return False
-        if cell == Blocks.BLOCK_2x1:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x1)
-            if loc is None or loc.col == 0:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(row, col - 1):
-                self._grid[row, col - 1] = Blocks.BLOCK_2x1
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x1
-            return False
-        if cell == Blocks.BLOCK_1x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_1x2)
-            if loc is None or loc.col == 0:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row, loc.col - 1) and not self.if_block_at(loc.row + 1, loc.col - 1):
-                self._grid[loc.row, loc.col - 1] = Blocks.BLOCK_1x2
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_1x2
-            return False
-        elif cell == Blocks.BLOCK_2x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x2)
-            if loc is None or loc.col == 0:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row, loc.col - 1) and not self.if_block_at(loc.row + 1, loc.col - 1):
-                self._grid[loc.row, loc.col - 1] = Blocks.BLOCK_2x2
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x2
-            return False
-        else:
-            return False
+        return self.move(row, col, Directions.LEFT)
 
     def move_down(self, row: int, col: int) -> bool:
-        cell = self.block_at(row, col)
-
-        if cell == 0:
-            return False
-
-        if cell == Blocks.BLOCK_1x1:
-            self._grid[row, col] = 0
-
-            if self.check_if_in_bounds(row + 1, col) and not self.if_block_at(row + 1, col):
-                self.set_at(row + 1, col, Blocks.BLOCK_1x1)
-                self._grid[row, col] = 0
-                return True
-
-            self._grid[row, col] = Blocks.BLOCK_1x1
-            return False
-        elif cell == Blocks.BLOCK_2x1:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x1)
-            if loc is None or loc.row == cfg.GRID_ROWS - 1:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row + 1, loc.col) and not self.if_block_at(loc.row + 1, loc.col + 1):
-                self._grid[row + 1, col] = Blocks.BLOCK_2x1
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x1
-            return False
-        elif cell == Blocks.BLOCK_1x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_1x2)
-            if loc is None or loc.row == cfg.GRID_ROWS - 2:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row + 2, loc.col):
-                self._grid[loc.row + 1, loc.col] = Blocks.BLOCK_1x2
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_1x2
-            return False
-        elif cell == Blocks.BLOCK_2x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x2)
-            if loc is None or loc.row == cfg.GRID_ROWS - 2:
-                return False
-
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row + 2, loc.col) and not self.if_block_at(loc.row + 2, loc.col + 1):
-                self._grid[loc.row + 1, loc.col] = Blocks.BLOCK_2x2
-                return True
-
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x2
-            return False
-        else:
-            return False
+        return self.move(row, col, Directions.DOWN)
 
     def move_up(self, row: int, col: int) -> bool:
-        cell = self.block_at(row, col)
-
-        if cell == 0:
+        return self.move(row, col, Directions.UP)
+
+    def legal_moves(self) -> List[Tuple[int, int, int]]:
+        """
+        every move that would succeed, read off the lookup tables in bitboard instead of
+        trying each move_* and undoing it
+        :return: (row, col, direction) for every move, row-col being the topleft of the block
+        """
+        return self.tables.legal_moves(self.state)
+
+    def slide(self, row: int, col: int, direction: int, max_steps: Optional[int]=None) -> List[GridVector]:
+        """
+        moves the block at row-col in a direction until it hits something or has gone
+        max_steps cells
+        :param row: any cell of the block
+        :param col: any cell of the block
+        :param direction: one of Directions.*
+        :param max_steps: None to go as far as it can
+        :return: the topleft of the block after every step, empty if it could not move
+        """
+        owner = self._owner(row, col)
+        if owner is None or not 0 <= direction < 4:
+            return []
+
+        _, row, col = owner
+        d_row, d_col = self.tables.delta[direction]
+        reached = []
+        while (max_steps is None or len(reached) < max_steps) and self.move(row, col, direction):
+            row, col = row + d_row, col + d_col
+            reached.append(GridVector(row, col))
+        return reached
+
+    def move(self, row: int, col: int, direction: int) -> bool:
+        """
+        moves the block covering row-col one cell if every cell it moves into is free,
+        the same for every shape so nothing depends on the size of the board
+        :param row: any cell of the block
+        :param col: any cell of the block
+        :param direction: one of Directions.*
+        :return: if the block moved
+        """
+        owner = self._owner(row, col)
+        if owner is None or not 0 <= direction < 4:
             return False
 
-        if cell == Blocks.BLOCK_1x1:
-            self._grid[row, col] = 0
-
-            if self.check_if_in_bounds(row - 1, col) and not self.if_block_at(row - 1, col):
-                self.set_at(row - 1, col, Blocks.BLOCK_1x1)
-                self._grid[row, col] = 0
-                return True
-
-            self._grid[row, col] = Blocks.BLOCK_1x1
-            return False
-        elif cell == Blocks.BLOCK_2x1:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x1)
-            if loc is None or loc.row == 0:
+        typ, row, col = owner
+        for d_row, d_col in self._probes[typ][direction]:
+            if self.if_block_at(row + d_row, col + d_col):
                 return False
 
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row - 1, loc.col) and not self.if_block_at(loc.row - 1, loc.col + 1):
-                self._grid[row - 1, col] = Blocks.BLOCK_2x1
-                return True
+        d_row, d_col = self.tables.delta[direction]
+        self._write(row, col, Blocks.BLOCK_NONE)
+        self._write(row + d_row, col + d_col, typ)
+        return True
+
+    def block_rect(self, row: int, col: int, typ: int) -> pygame.Rect:
+        rows, cols = Blocks.SIZE.get(typ, (1, 1))
+        col += Blocks.LEFT.get(typ, 0)
+        return pygame.Rect(
+            1 + col + col * self.cell_size,
+            1 + row + row * self.cell_size + cfg.UTIL_BAR_HEIGHT,
+            cols * self.cell_size + cols - 1,
+            rows * self.cell_size + rows - 1,
+        )
 
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x1
-        elif cell == Blocks.BLOCK_1x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_1x2)
-            if loc is None or loc.row == 0:
-                return False
+    def dirty_rect(self) -> Optional[pygame.Rect]:
+        """
+        the part of the screen that changed since the grid was last drawn
+        :return: pygame.Rect or None if nothing changed
+        """
+        if self._drawn is None or self._drawn.shape != self._grid.shape:
+            return self.grid_surface.get_rect(topleft=(0, cfg.UTIL_BAR_HEIGHT))
 
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row - 1, loc.col):
-                self._grid[loc.row - 1, loc.col] = Blocks.BLOCK_1x2
-                return True
+        rects = []
+        for row, col in np.argwhere(self._drawn != self._grid).tolist():
+            for value in (self._drawn[row, col], self._grid[row, col]):
+                if value:
+                    rects.append(self.block_rect(row, col, value))
 
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_1x2
-            return False
-        elif cell == Blocks.BLOCK_2x2:
-            loc = self.locate_block(row, col, Blocks.BLOCK_2x2)
-            if loc is None or loc.row == 0:
-                return False
+        return rects[0].unionall(rects[1:]) if rects else None
 
-            self._grid[loc.row, loc.col] = 0
-            if not self.if_block_at(loc.row - 1, loc.col) and not self.if_block_at(loc.row - 1, loc.col + 1):
-                self._grid[loc.row - 1, loc.col] = Blocks.BLOCK_2x2
-                return True
+    def draw_dirty_to(self, surface: pygame.surface.Surface) -> List[pygame.Rect]:
+        rect = self.dirty_rect()
+        if rect is None:
+            return []
 
-            self._grid[loc.row, loc.col] = Blocks.BLOCK_2x2
-            return False
-        else:
-            return False
+        surface.set_clip(rect)
+        self.draw_to(surface)
+        surface.set_clip(None)
+        return [rect]
 
-    def draw_to(self, surface: pygame.surface.Surface) -> None:
-        surface.blit(self.grid_surface, (0, cfg.UTIL_BAR_HEIGHT))
+    def composite(self) -> pygame.Surface:
+        composite = self.grid_surface.copy()
 
         for rowi, row in enumerate(self._grid):
             for coli, value in enumerate(row):
                 if value == 0:
                     continue
+                coli += Blocks.LEFT[value]
                 x = 1 + coli + coli * self.cell_size
-                y = 1 + rowi + rowi * self.cell_size + cfg.UTIL_BAR_HEIGHT
-                surface.blit(Blocks.CODE[value], (x, y))
+                y = 1 + rowi + rowi * self.cell_size
+                composite.blit(Blocks.image(value), (x, y))
+
+        return composite
+
+    def draw_to(self, surface: pygame.surface.Surface) -> None:
+        key = (self.rows, self.cols, self.key)
+        surface.blit(Grid._composites.get(key, self.composite), (0, cfg.UTIL_BAR_HEIGHT))
+        self._drawn = self._grid.copy()
 
     def draw(self) -> None:
         self.draw_to(cfg.get_main_surface())
@@ -1,6 +1,8 @@
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Union, Optional, Tuple, Iterable
 
 import src.mouse as mouse
+import src.utils as utils
+import src.bitboard as bitboard
 
 import numpy as np
 
@@ -13,11 +15,46 @@ class Blocks:
     BLOCK_2x1: int
     BLOCK_1x2: int
     BLOCK_2x2: int
+    BLOCK_L_TOPLEFT: int
+    BLOCK_L_TOPRIGHT: int
+    BLOCK_L_BOTTOMLEFT: int
+    BLOCK_L_BOTTOMRIGHT: int
+    BLOCK_WALL: int
 
+    # (row, col) of every cell from the anchor, the anchor being the first cell row by row
+    SHAPES: Dict[int, Tuple[Tuple[int, int], ...]]
+    SIZE: Dict[int, Tuple[int, int]]
+    LEFT: Dict[int, int]
+    CLASSIC: Tuple[int, ...]
     CODE: Dict[int, pygame.Surface]
 
+    @classmethod
+    def register(cls, typ: int, cells: List[Tuple[int, int]]) -> None: ...
+    # works out SIZE and LEFT of a shape
+    @classmethod
+    def measure(cls, typ: int) -> None: ...
+    # CLASSIC and every other type in values
+    @classmethod
+    def types_for(cls, values: Iterable[int]) -> Tuple[int, ...]: ...
+    # the cells from the anchor a block moves into
+    @staticmethod
+    def probes(typ: int, d_row: int, d_col: int) -> List[Tuple[int, int]]: ...
+    # the type whose shape is typ flipped left to right
+    @staticmethod
+    def mirror(typ: int) -> Optional[int]: ...
+    # draws a shape that has no image
+    @staticmethod
+    def render(typ: int, cell_size: int, color: Tuple[int, int, int], border: int=0) -> pygame.Surface: ...
     @classmethod
     def load(cls) -> None: ...
+    @classmethod
+    def image(cls, typ: int) -> pygame.Surface: ...
+
+class Directions:
+    RIGHT: int
+    LEFT: int
+    UP: int
+    DOWN: int
 
 class GridVector:
     row: int
@@ -31,27 +68,76 @@ class GridVector:
     def __eq__(self, other: GridVector) -> bool: ...
 
 
+# (typ, row, col) for every cell of every shape and typ -> direction -> the cells a block moves into
+def shape_tables(types: Tuple[int, ...]) -> Tuple[List[Tuple[int, int, int]], Dict[int, List[List[Tuple[int, int]]]]]: ...
+
+
 class Grid:
     rows: int
     cols: int
+    types: Tuple[int, ...]
     cell_size: int
     _grid: np.ndarray
-    grid_surface: pygame.Surface
-    def __init__(self) -> None: ...
+    _grid_surfaces: Dict[Tuple[int, int, int], pygame.Surface]
+    _composites: utils.SurfaceCache
+    _drawn: Optional[np.ndarray]
+    _cover: List[Tuple[int, int, int]]
+    tables: bitboard.Tables
+    _probes: Dict[int, List[List[Tuple[int, int]]]]
+    _target: Optional[List[List[int]]]
+    matching: int
+    # bitboard.Tables.pack of the grid
+    key: int
+    # the xor of bitboard.Tables.zobrist for the value of every cell
+    zobrist: int
+    # the grid as a bitboard state of tables
+    state: int
+    def __init__(self, rows: int=..., cols: int=..., types: Iterable[int]=...) -> None: ...
+    # loaded or drawn the first time a grid of that size is drawn
+    @property
+    def grid_surface(self) -> pygame.Surface: ...
+    def block_rect(self, row: int, col: int, typ: int) -> pygame.Rect: ...
+    # the part of the screen that changed since the grid was last drawn
+    def dirty_rect(self) -> Optional[pygame.Rect]: ...
+    # redraws only that part and returns it
+    def draw_dirty_to(self, surface: pygame.Surface) -> List[pygame.Rect]: ...
+    # the background with the blocks on it
+    def composite(self) -> pygame.Surface: ...
     def draw_to(self, surface: pygame.Surface) -> None: ...
     def draw(self) -> None: ...
     def at(self, row: int, col: int) -> int: ...
     def set_at(self, row: int, col: int, value: int) -> bool: ...
+    # (typ, row, col) of the anchor of the block covering row-col
+    def _owner(self, row: int, col: int) -> Optional[Tuple[int, int, int]]: ...
     def locate_block(self, row: int, col: int, typ: int) -> Optional[GridVector]: ...
-    # a pair of Blocks.BLOCK_* and the count of each one
-    def random_gen(self, counts: Dict[int, int]) -> None: ...
-    def set(self, grid: Union[np.ndarray, List[List[int]]]) -> None: ...
+    # a pair of Blocks.BLOCK_* and the count of each one, returns how many placements were tried
+    def random_gen(self, counts: Dict[int, int]) -> int: ...
+    # copy=False keeps a uint8 array as the grid, moves then write into it
+    def set(self, grid: Union[np.ndarray, List[List[int]]], copy: bool=True) -> None: ...
+    # the grid solved() compares against, None to stop tracking
+    def set_target(self, target: Optional[Union[np.ndarray, List[List[int]]]]) -> None: ...
+    # works out matching, key and zobrist from scratch
+    def _refresh(self) -> None: ...
+    # every cell of the target matches
+    def solved(self) -> bool: ...
+    # key of the grid or of its mirror image, whichever is smaller
+    def canonical_key(self) -> int: ...
+    # the bits of the state a block of typ anchored at cell sets
+    def _state_bits(self, typ: int, cell: int) -> int: ...
+    # every cell change goes through here so matching, key, zobrist and state stay right
+    def _write(self, row: int, col: int, value: int) -> None: ...
     def tobytes(self) -> bytes: ...
     def get_grid(self) -> np.ndarray: ...
     def move_right(self, row: int, col: int) -> bool: ...
     def move_left(self, row: int, col: int) -> bool: ...
     def move_down(self, row: int, col: int) -> bool: ...
     def move_up(self, row: int, col: int) -> bool: ...
+    # (row, col, direction) for every legal move, row-col being the topleft of the block
+    def legal_moves(self) -> List[Tuple[int, int, int]]: ...
+    # the topleft of the block after every step, max_steps None to go as far as it can
+    def slide(self, row: int, col: int, direction: int, max_steps: Optional[int]=None) -> List[GridVector]: ...
+    # direction is one of Directions.*, row-col can be any cell of the block
+    def move(self, row: int, col: int, direction: int) -> bool: ...
     def check_if_in_bounds(self, row: int, col: int) -> bool: ...
     def if_block_at(self, row: int, col: int) -> bool: ...
     def block_at(self, row: int, col: int) -> int: ...
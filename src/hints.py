@@ -0,0 +1,214 @@
+"""
+next best move hints
+
+a bfs back from the solution gives how many moves every board is away from it, after
+that a hint is a lookup of every legal move of the board the player has, nothing is
+searched again, a Grid keeps its bitboard state up to date with every move_* so there
+is nothing to work out between two hints either
+
+the map only holds whole layers of the bfs and stops before it holds more than
+max_states boards, a board further away than its last layer is searched from up to
+max_depth moves deep for the closest board in the map, when none is in reach an A*
+is run with the map as its heuristic, a board outside the map
+is more than radius moves away, and when that gives up too the hint is the move
+towards the board of the first search that solver.manhattan rates best, leaving out
+the boards it already gave a hint for so it does not send the player around in circles
+
+the map is built on a thread of its own but the searches run on the thread asking for
+the hint, the game's frame, so both of them together hold at most search_states boards
+and a hint far from the map is a manhattan one rather than a frozen window
+"""
+
+from typing import Set, Dict, Optional, Tuple, Callable
+
+import src.config as cfg
+import src.bitboard as bitboard
+import src.solver as solver
+
+import threading
+
+
+class HintEngine:
+    def __init__(self, solution: solver.Board, max_states: int=cfg.HINT_MAX_STATES, max_depth: int=cfg.HINT_MAX_DEPTH,
+                 search_states: int=cfg.HINT_SEARCH_MAX_STATES) -> None:
+        """
+        :param solution: the board to reach
+        :param max_states: the most boards the map may hold
+        :param max_depth: how many moves deep a board outside the map is searched from
+        :param search_states: the most boards the searches from a board outside the map may hold
+        """
+        self.tables: bitboard.Tables = bitboard.get_tables(*solver.board_shape(solution), solver.board_types(solution))
+        self.goal: int = solver.to_state(solution, self.tables)
+        self.max_states: int = max_states
+        self.max_depth: int = max_depth
+        self.search_states: int = search_states
+
+        # board -> moves to the solution
+        self.distances: Dict[int, int] = {}
+        # every board this many moves or less from the solution is in distances
+        self.radius: int = -1
+        # the bfs found every board there is, one that is not in distances can not be solved
+        self.complete: bool = False
+        # the boards outside the map the player got hints for since they were last in it
+        self.trail: Set[int] = set()
+
+        self.ready: threading.Event = threading.Event()
+        self.stopped: threading.Event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        builds the map on a background thread, hints wait for it when they come too early
+        """
+        if self.thread is not None or self.ready.is_set():
+            return
+        self.thread = threading.Thread(target=self.build, name="hint-map", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def build(self) -> None:
+        distances = {self.goal: 0}
+        neighbours = self.tables.neighbours
+        frontier = [self.goal]
+        radius = 0
+        try:
+            while frontier and not self.stopped.is_set():
+                layer: Dict[int, int] = {}
+                for state in frontier:
+                    for new_state in neighbours(state):
+                        if new_state not in distances and new_state not in layer:
+                            layer[new_state] = radius + 1
+                    if len(distances) + len(layer) > self.max_states or self.stopped.is_set():
+                        break
+                else:
+                    distances.update(layer)
+                    frontier = list(layer)
+                    radius += 1
+                    continue
+                # a layer that does not fit is dropped whole so the map never has gaps
+                break
+
+            self.distances = distances
+            self.radius = radius
+            self.complete = not frontier
+        finally:
+            self.ready.set()
+
+    def wait(self) -> None:
+        if not self.ready.is_set():
+            if self.thread is None:
+                self.build()
+            self.ready.wait()
+
+    def search(self, state: int) -> Tuple[Optional[int], Optional[solver.Move]]:
+        """
+        a bfs from a board outside the map, up to max_depth moves deep, then an A*, the
+        two of them hold at most search_states boards
+        :param state: int
+        :return: the distance to the solution, None when neither search reached it,
+                 and the move to make, None if there is none
+        """
+        distances = self.distances
+        neighbours = self.tables.neighbours
+        estimate = solver.manhattan(self.tables, self.goal)
+
+        # board -> the neighbour of state it was reached through
+        first: Dict[int, int] = {state: state}
+        layer = []
+        for new_state in neighbours(state):
+            if new_state not in first:
+                first[new_state] = new_state
+                layer.append(new_state)
+
+        # (moves made + estimate, board) of the best board the search saw
+        best: Tuple[int, Optional[int]] = (1 << 30, None)
+        depth = 1
+        while layer:
+            hits = [(distances[new_state], new_state) for new_state in layer if new_state in distances]
+            if hits:
+                distance, new_state = min(hits)
+                return depth + distance, solver.move_between(self.tables, state, first[new_state])
+            best = min([best] + [
+                (depth + estimate(new_state), new_state) for new_state in layer if first[new_state] not in self.trail
+            ])
+            if depth == self.max_depth:
+                break
+
+            next_layer = []
+            for current in layer:
+                for new_state in neighbours(current):
+                    if new_state not in first:
+                        first[new_state] = first[current]
+                        next_layer.append(new_state)
+                if len(first) >= self.search_states:
+                    break
+            else:
+                layer = next_layer
+                depth += 1
+                continue
+            # a layer that does not fit is dropped whole, a board in the map from part of it
+            # may not be the closest one
+            break
+
+        moves = None
+        if len(first) < self.search_states:
+            moves = solver.astar(self.tables, state, self.goal, self.search_states - len(first), self.estimate())
+        if moves is not None:
+            return len(moves), moves[0] if moves else None
+        if best[1] is None:
+            return None, None
+        return None, solver.move_between(self.tables, state, first[best[1]])
+
+    def estimate(self) -> Callable[[int], int]:
+        """
+        the map where it has the board, outside of it the board is more than radius moves away
+        """
+        distances = self.distances
+        manhattan = solver.manhattan(self.tables, self.goal)
+        outside = self.radius + 1
+
+        def estimate(state: int) -> int:
+            distance = distances.get(state)
+            return distance if distance is not None else max(manhattan(state), outside)
+
+        return estimate
+
+    def distance(self, board: solver.Board) -> Optional[int]:
+        """
+        :param board: the board the player has
+        :return: the least number of moves to the solution, None when it is not known
+        """
+        self.wait()
+        state = solver.to_state(board, self.tables)
+        if state in self.distances:
+            return self.distances[state]
+        if self.complete:
+            return None
+        return self.search(state)[0]
+
+    def hint(self, board: solver.Board) -> Optional[solver.Move]:
+        """
+        :param board: the board the player has
+        :return: (row, col, direction) of the move to make, None when solved or it can not be solved
+        """
+        self.wait()
+        state = solver.to_state(board, self.tables)
+        if state == self.goal:
+            return None
+
+        if state in self.distances:
+            self.trail.clear()
+            closer = self.distances[state] - 1
+            for typ, anchor, direction, new_state in self.tables.successors(state):
+                if self.distances.get(new_state) == closer:
+                    return (*divmod(anchor, self.tables.cols), direction)
+        if self.complete:
+            return None
+
+        self.trail.add(state)
+        return self.search(state)[1]
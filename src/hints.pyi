@@ -0,0 +1,36 @@
+from typing import Set, Dict, Optional, Tuple, Callable
+
+import src.bitboard as bitboard
+import src.solver as solver
+
+import threading
+
+
+class HintEngine:
+    tables: bitboard.Tables
+    goal: int
+    max_states: int
+    max_depth: int
+    search_states: int
+    distances: Dict[int, int]
+    radius: int
+    complete: bool
+    trail: Set[int]
+    ready: threading.Event
+    stopped: threading.Event
+    thread: Optional[threading.Thread]
+
+    def __init__(self, solution: solver.Board, max_states: int=..., max_depth: int=..., search_states: int=...) -> None: ...
+    def start(self) -> None: ...
+    def stop(self) -> None: ...
+    # runs on the background thread
+    def build(self) -> None: ...
+    # builds the map right away when it was never started
+    def wait(self) -> None: ...
+    # (distance or None, move or None) for a board outside the map, holding at most search_states boards
+    def search(self, state: int) -> Tuple[Optional[int], Optional[solver.Move]]: ...
+    # the map where it has the board, at least radius + 1 where it does not
+    def estimate(self) -> Callable[[int], int]: ...
+    def distance(self, board: solver.Board) -> Optional[int]: ...
+    # None when solved or it can not be solved
+    def hint(self, board: solver.Board) -> Optional[solver.Move]: ...
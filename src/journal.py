@@ -0,0 +1,324 @@
+"""
+a journal of the moves made on a board, undo and redo, and replaying it without the game
+
+the file is the 16 byte header of the corpus module with its own magic, the board the
+moves start from and the board to reach, both rows x cols uint8, then one 8 byte entry
+for every move, undo and redo
+    time       uint32, milliseconds since the journal was started
+    row, col   uint8, the topleft of the block before it moved
+    direction  uint8, one of grid.Directions.*
+    kind       uint8, one of Kinds.*
+an undo holds the move that took the block back, so every entry is a plain move and a
+replay does not have to know about undo at all, entries only ever get appended so the
+file is a full record of what the player did, undo included, and a journal cut off
+half way through an entry still reads up to the last whole one
+
+undo and redo walk a list of the moves with a cursor in it, an undo moves the block
+under the cursor back the way it came, a redo makes the move after it again and a new
+move drops every move after the cursor, none of them look at more than one move
+
+replay runs the entries on a bitboard.Tables state, one xor for each of them, to check
+a solution or to get the board after any entry without a Grid or the game
+
+run it with
+    python -m src.journal data/journals/*.shj
+to replay journals and print how long each puzzle took to solve
+"""
+
+from typing import List, Optional, Union, Tuple
+
+import src.config as cfg
+import src.grid as grid
+import src.bitboard as bitboard
+import src.solver as solver
+import src.corpus as corpus
+
+import numpy as np
+
+from pathlib import Path
+import argparse
+import time
+
+
+MAGIC: bytes = b"SHFTYJRN"
+VERSION: int = 1
+SUFFIX: str = ".shj"
+
+ENTRY: np.dtype = np.dtype([
+    ("time", "<u4"),
+    ("row", "u1"),
+    ("col", "u1"),
+    ("direction", "u1"),
+    ("kind", "u1"),
+])
+
+
+class Kinds:
+    MOVE: int = 0
+    UNDO: int = 1
+    REDO: int = 2
+
+
+def read(path: Union[Path, str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :param path: a journal file
+    :return: the start board, the board to reach and the ENTRY of every whole entry
+    """
+    header = np.fromfile(path, dtype=corpus.HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} is not a journal")
+    if header["version"][0] != VERSION:
+        raise ValueError(f"{path} is version {header['version'][0]}, only version {VERSION} can be read")
+    shape = int(header["rows"][0]), int(header["cols"][0])
+
+    boards = np.fromfile(path, dtype=np.uint8, count=2 * shape[0] * shape[1], offset=corpus.HEADER.itemsize)
+    if len(boards) != 2 * shape[0] * shape[1]:
+        raise ValueError(f"{path} ends before its boards")
+    offset = corpus.HEADER.itemsize + boards.nbytes
+    count = (Path(path).stat().st_size - offset) // ENTRY.itemsize
+    entries = np.fromfile(path, dtype=ENTRY, count=count, offset=offset)
+    start, solution = boards.reshape((2, *shape))
+    return start, solution, entries
+
+
+class Journal:
+    def __init__(self, start: np.ndarray, solution: np.ndarray, path: Optional[Union[Path, str]]=None) -> None:
+        """
+        :param start: the board the moves start from
+        :param solution: the board to reach
+        :param path: the file to append the entries to, None to keep them in memory only
+        """
+        self.start: np.ndarray = np.array(start, dtype=np.uint8)
+        self.solution: np.ndarray = np.array(solution, dtype=np.uint8)
+        self.rows, self.cols = self.start.shape
+        self.tables: bitboard.Tables = bitboard.get_tables(
+            self.rows,
+            self.cols,
+            set(solver.board_types(self.start)) | set(solver.board_types(self.solution)),
+        )
+
+        self.path: Optional[Path] = None if path is None else Path(path)
+        # opened with the first entry so a puzzle that was never touched leaves no file
+        self.file = None
+        self.start_time: float = time.monotonic()
+        # every entry, the file holds the same bytes after the boards
+        self.entries: bytearray = bytearray()
+
+        # the moves undo and redo walk through, the ones before the cursor are on the board
+        self.moves: List[solver.Move] = []
+        self.cursor: int = 0
+
+    @staticmethod
+    def new_path(directory: Path=cfg.Paths.JOURNALS) -> Path:
+        now = time.time()
+        return directory / f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}{SUFFIX}"
+
+    def __len__(self) -> int:
+        return len(self.entries) // ENTRY.itemsize
+
+    def _append(self, move: solver.Move, kind: int) -> None:
+        entry = np.array([(
+            int((time.monotonic() - self.start_time) * 1000),
+            *move,
+            kind,
+        )], dtype=ENTRY).tobytes()
+        self.entries += entry
+
+        if self.path is None:
+            return
+        if self.file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, "wb")
+            header = np.zeros(1, dtype=corpus.HEADER)
+            header["magic"] = MAGIC
+            header["version"] = VERSION
+            header["rows"] = self.rows
+            header["cols"] = self.cols
+            self.file.write(header.tobytes() + self.start.tobytes() + self.solution.tobytes())
+        self.file.write(entry)
+        # a crash loses at most the move being made
+        self.file.flush()
+
+    def record(self, move: solver.Move) -> None:
+        """
+        a move that was already made on the board
+        :param move: (row, col, direction), row-col being the topleft of the block before it moved
+        """
+        del self.moves[self.cursor:]
+        self.moves.append(move)
+        self.cursor += 1
+        self._append(move, Kinds.MOVE)
+
+    def move(self, board: Union[grid.Grid, bitboard.BitGrid], row: int, col: int, direction: int) -> bool:
+        """
+        board.move and record it
+        :return: if the block moved
+        """
+        return len(self.slide(board, row, col, direction, 1)) == 1
+
+    def slide(self, board: Union[grid.Grid, bitboard.BitGrid], row: int, col: int, direction: int, max_steps: Optional[int]=None) -> List[grid.GridVector]:
+        """
+        board.slide and record every step of it as a move
+        :return: the topleft of the block after every step, empty if it could not move
+        """
+        reached = board.slide(row, col, direction, max_steps)
+        d_row, d_col = self.tables.delta[direction]
+        for anchor in reached:
+            self.record((anchor.row - d_row, anchor.col - d_col, direction))
+        return reached
+
+    def can_undo(self) -> bool:
+        return self.cursor > 0
+
+    def can_redo(self) -> bool:
+        return self.cursor < len(self.moves)
+
+    def undo(self, board: Union[grid.Grid, bitboard.BitGrid]) -> Optional[solver.Move]:
+        """
+        :param board: the board the moves were made on
+        :return: the move that took the block back, None when there is nothing to undo
+        """
+        if not self.can_undo():
+            return None
+        row, col, direction = self.moves[self.cursor - 1]
+        d_row, d_col = self.tables.delta[direction]
+        back = (row + d_row, col + d_col, self.tables.delta.index((-d_row, -d_col)))
+        moved = board.move(*back)
+        assert moved, f"the board does not match the journal, {back} can not be made"
+        self.cursor -= 1
+        self._append(back, Kinds.UNDO)
+        return back
+
+    def redo(self, board: Union[grid.Grid, bitboard.BitGrid]) -> Optional[solver.Move]:
+        """
+        :param board: the board the moves were made on
+        :return: the move made again, None when there is nothing to redo
+        """
+        if not self.can_redo():
+            return None
+        move = self.moves[self.cursor]
+        moved = board.move(*move)
+        assert moved, f"the board does not match the journal, {move} can not be made"
+        self.cursor += 1
+        self._append(move, Kinds.REDO)
+        return move
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class Replay:
+    def __init__(self, state: int, tables: bitboard.Tables, entries: int, kinds: np.ndarray, solved_at: Optional[int], solve_time: Optional[int]) -> None:
+        """
+        :param state: the state after the last entry replayed
+        :param tables: the tables of state
+        :param entries: how many entries were replayed
+        :param kinds: how many entries of every one of Kinds.*
+        :param solved_at: the index of the first entry that reached the solution, None if none did
+        :param solve_time: the time of that entry in milliseconds
+        """
+        self.state: int = state
+        self.tables: bitboard.Tables = tables
+        self.entries: int = entries
+        self.kinds: np.ndarray = kinds
+        self.solved_at: Optional[int] = solved_at
+        self.solve_time: Optional[int] = solve_time
+
+    @property
+    def solved(self) -> bool:
+        return self.solved_at is not None
+
+    def board(self) -> np.ndarray:
+        return self.tables.to_array(self.state)
+
+    def __repr__(self) -> str:
+        return (f"journal.Replay(entries={self.entries}, moves={self.kinds[Kinds.MOVE]}, undos={self.kinds[Kinds.UNDO]}, "
+                f"redos={self.kinds[Kinds.REDO]}, solved_at={self.solved_at}, solve_time={self.solve_time})")
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def replay(start: np.ndarray, solution: np.ndarray, entries: np.ndarray, stop: Optional[int]=None) -> Replay:
+    """
+    :param start: the board the moves start from
+    :param solution: the board to reach
+    :param entries: ENTRY
+    :param stop: replay only the entries before this one, all of them when None
+    :return: Replay
+    :raises ValueError: at the first entry that is not a legal move
+    """
+    tables = bitboard.get_tables(*start.shape, set(solver.board_types(start)) | set(solver.board_types(solution)))
+    state = tables.from_array(start)
+    goal = tables.from_array(solution)
+    entries = entries[:stop]
+
+    # fields of the types from the biggest shift down, an anchor bit is only ever set in one of them
+    fields = [(typ, typ * tables.cells) for typ in reversed(tables.types)]
+    toggle = tables.toggle
+    can_move = tables.can_move
+    height, width = tables.rows, tables.cols
+
+    solved_at = None
+    moves = zip(entries["row"].tolist(), entries["col"].tolist(), entries["direction"].tolist())
+    for index, (row, col, direction) in enumerate(moves):
+        # a col off the board would wrap into the next row and a row off it into the next field
+        typ = None
+        anchor = row * width + col
+        if row < height and col < width:
+            for typ, shift in fields:
+                if (state >> (shift + anchor)) & 1:
+                    break
+            else:
+                typ = None
+        if typ is None or direction > 3 or not can_move(state, typ, anchor, direction):
+            raise ValueError(f"entry {index} moves {(row, col, direction)}, which is not a legal move")
+        state ^= toggle[typ][direction][anchor]
+        if solved_at is None and state == goal:
+            solved_at = index
+
+    kinds = np.bincount(entries["kind"], minlength=3)
+    solve_time = None if solved_at is None else int(entries["time"][solved_at])
+    return Replay(state, tables, len(entries), kinds, solved_at, solve_time)
+
+
+def replay_file(path: Union[Path, str], stop: Optional[int]=None) -> Replay:
+    return replay(*read(path), stop)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="replay journals without the game and check their solutions")
+    parser.add_argument("journals", type=Path, nargs="*", help=f"defaults to every journal in {cfg.Paths.JOURNALS}")
+    args = parser.parse_args()
+
+    paths = args.journals or sorted(cfg.Paths.JOURNALS.glob(f"*{SUFFIX}"))
+    start_time = time.perf_counter()
+    entries = solved = 0
+    for path in paths:
+        try:
+            result = replay_file(path)
+        except ValueError as error:
+            print(f"{path.name}: {error}")
+            continue
+        entries += result.entries
+        solved += result.solved
+        moves, undos, redos = result.kinds.tolist()[:3]
+        line = f"{path.name}: {moves} moves, {undos} undos, {redos} redos"
+        if result.solved:
+            line += f", solved at entry {result.solved_at} after {result.solve_time / 1000:.1f}s"
+        print(line)
+
+    wall_time = time.perf_counter() - start_time
+    print(f"replayed {entries} entries of {len(paths)} journals in {wall_time:.2f}s, {solved} solved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from typing import List, Optional, Union, Tuple
+
+from pathlib import Path
+
+import src.grid as grid
+import src.bitboard as bitboard
+import src.solver as solver
+
+import numpy as np
+
+
+MAGIC: bytes
+VERSION: int
+SUFFIX: str
+ENTRY: np.dtype
+
+
+class Kinds:
+    MOVE: int
+    UNDO: int
+    REDO: int
+
+
+# (start, solution, entries), a half written last entry is left out
+def read(path: Union[Path, str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]: ...
+
+
+class Journal:
+    start: np.ndarray
+    solution: np.ndarray
+    rows: int
+    cols: int
+    tables: bitboard.Tables
+    path: Optional[Path]
+    start_time: float
+    entries: bytearray
+    moves: List[solver.Move]
+    cursor: int
+
+    def __init__(self, start: np.ndarray, solution: np.ndarray, path: Optional[Union[Path, str]]=None) -> None: ...
+    # a file named after the time it was made
+    @staticmethod
+    def new_path(directory: Path=...) -> Path: ...
+    def __len__(self) -> int: ...
+    # writes the header and the boards before the first entry
+    def _append(self, move: solver.Move, kind: int) -> None: ...
+    # drops the moves after the cursor
+    def record(self, move: solver.Move) -> None: ...
+    def move(self, board: Union[grid.Grid, bitboard.BitGrid], row: int, col: int, direction: int) -> bool: ...
+    def slide(self, board: Union[grid.Grid, bitboard.BitGrid], row: int, col: int, direction: int, max_steps: Optional[int]=None) -> List[grid.GridVector]: ...
+    def can_undo(self) -> bool: ...
+    def can_redo(self) -> bool: ...
+    def undo(self, board: Union[grid.Grid, bitboard.BitGrid]) -> Optional[solver.Move]: ...
+    def redo(self, board: Union[grid.Grid, bitboard.BitGrid]) -> Optional[solver.Move]: ...
+    def close(self) -> None: ...
+    def __enter__(self) -> Journal: ...
+    def __exit__(self, *_) -> None: ...
+
+
+class Replay:
+    state: int
+    tables: bitboard.Tables
+    entries: int
+    kinds: np.ndarray
+    solved_at: Optional[int]
+    solve_time: Optional[int]
+
+    def __init__(self, state: int, tables: bitboard.Tables, entries: int, kinds: np.ndarray, solved_at: Optional[int], solve_time: Optional[int]) -> None: ...
+    @property
+    def solved(self) -> bool: ...
+    def board(self) -> np.ndarray: ...
+    def __repr__(self) -> str: ...
+    def __str__(self) -> str: ...
+
+
+# raises ValueError at the first entry that is not a legal move
+def replay(start: np.ndarray, solution: np.ndarray, entries: np.ndarray, stop: Optional[int]=None) -> Replay: ...
+def replay_file(path: Union[Path, str], stop: Optional[int]=None) -> Replay: ...
+def main() -> None: ...
@@ -0,0 +1,369 @@
+"""
+pattern databases, exact distances of smaller puzzles used as an A* heuristic
+
+a pattern is a few blocks, its puzzle is the same board with every other block taken
+off, so the blocks of the pattern can only get in each others way, a bfs back from
+every way the pattern blocks can sit on the goal anchors of their types gives the
+exact distance of every placement of them
+
+a move of the real puzzle moves one block, so the distance of a pattern never counts
+a move of a block outside of it, the distances of patterns that share no blocks can
+therefore be added up and the sum still never overestimates
+
+blocks of the same type can not be told apart, so when a type is split over several
+patterns its blocks are given out in the order of their anchors, the first ones to the
+first pattern and so on, that is one way of splitting them among many and every one of
+them gives a sum that never overestimates, it just does not have to be consistent
+
+the number of placements grows with the size of the board and the number of blocks,
+so a pattern only gets as many blocks as keep it near max_states and its bfs stops at
+max_states boards, a placement it did not get to is at least as far as the layer it
+stopped in
+
+the distances only hold for one goal, they can be saved under the goal so solving
+towards the same board again loads them instead of running the bfs, nothing is saved
+unless a directory is given
+
+run it with
+    python -m src.patterndb
+to compare the heuristic against solver.manhattan on generated puzzles
+"""
+
+from typing import List, Dict, Optional, Union, Tuple, Callable
+
+import src.config as cfg
+import src.grid as grid
+import src.bitboard as bitboard
+import src.solver as solver
+
+import numpy as np
+
+from pathlib import Path
+import collections
+import itertools
+import argparse
+import random
+import math
+import time
+import sys
+
+
+# the layout of the saved databases, they are kept in a directory named after it
+VERSION: int = 2
+
+# what a state whose pattern can not reach the goal at all gets
+UNREACHABLE: int = 1 << 30
+
+# the 2x2 block with the vertical ones and the small ones with the horizontal ones
+GROUPS: Tuple[Tuple[int, ...], ...] = (
+    (grid.Blocks.BLOCK_2x2, grid.Blocks.BLOCK_1x2),
+    (grid.Blocks.BLOCK_1x1, grid.Blocks.BLOCK_2x1),
+)
+
+
+def block_count(tables: bitboard.Tables, state: int, typ: int) -> int:
+    return bin(tables.anchors(state, typ)).count("1")
+
+
+def placements(tables: bitboard.Tables, pattern: List[int]) -> int:
+    """
+    :return: how many ways the blocks of pattern can be put on the board when they could overlap,
+             more than there really are
+    """
+    return math.prod(
+        math.comb(len(tables.anchors_of[typ]), count)
+        for typ, count in collections.Counter(pattern).items()
+    )
+
+
+def default_patterns(tables: bitboard.Tables, goal: int, max_states: int=cfg.PATTERN_MAX_STATES) -> List[Tuple[int, ...]]:
+    """
+    the blocks of every group of GROUPS and any other type on its own, a group gets
+    split over more patterns when its placements would go over max_states
+    :param tables: bitboard.Tables
+    :param goal: the goal state
+    :param max_states: the most placements a pattern should have
+    :return: patterns that share no blocks, a type once for every block of it
+    """
+    types = set(tables.types)
+    groups = []
+    for group in GROUPS:
+        group = tuple(typ for typ in group if typ in types)
+        types -= set(group)
+        groups.append(group)
+    groups += [(typ,) for typ in sorted(types)]
+
+    patterns = []
+    for group in groups:
+        pattern: List[int] = []
+        for typ in group:
+            for _ in range(block_count(tables, goal, typ)):
+                if pattern and placements(tables, pattern + [typ]) > max_states:
+                    patterns.append(tuple(pattern))
+                    pattern = []
+                pattern.append(typ)
+        if pattern:
+            patterns.append(tuple(pattern))
+    return patterns
+
+
+class PatternDB:
+    def __init__(
+            self,
+            tables: bitboard.Tables,
+            pattern: Tuple[int, ...],
+            goal: int,
+            distances: Dict[int, int],
+            missing: int=UNREACHABLE
+    ) -> None:
+        """
+        :param tables: bitboard.Tables
+        :param pattern: the block types in the pattern, once for every block
+        :param goal: the goal state of the whole board
+        :param distances: the anchor fields of the pattern blocks -> moves to the goal
+        :param missing: what a placement that is not in distances gets
+        """
+        self.tables: bitboard.Tables = tables
+        self.pattern: Tuple[int, ...] = tuple(sorted(pattern))
+        self.counts: Dict[int, int] = dict(collections.Counter(self.pattern))
+        # the anchor fields of the pattern types
+        self.mask: int = sum(tables.full << (typ * tables.cells) for typ in self.counts)
+        self.goal: int = goal & self.mask
+        self.distances: Dict[int, int] = distances
+        self.missing: int = missing
+
+    @staticmethod
+    def path_for(tables: bitboard.Tables, pattern: Tuple[int, ...], goal: int, directory: Path=cfg.Paths.PATTERNS) -> Path:
+        mask = sum(tables.full << (typ * tables.cells) for typ in set(pattern))
+        types = "-".join(str(typ) for typ in sorted(pattern))
+        return directory / f"v{VERSION}" / f"{tables.rows}x{tables.cols}" / f"{types}-{goal & mask:x}.npz"
+
+    @staticmethod
+    def build(tables: bitboard.Tables, pattern: Tuple[int, ...], goal: int, max_states: int=cfg.PATTERN_MAX_STATES) -> "PatternDB":
+        """
+        a bfs back from the goal with only the blocks of the pattern on the board, it
+        starts from every way they can sit on the goal anchors of their types
+        :param tables: bitboard.Tables
+        :param pattern: the block types in the pattern, once for every block
+        :param goal: the goal state of the whole board
+        :param max_states: stop after finding this many placements
+        :return: PatternDB
+        """
+        db = PatternDB(tables, pattern, goal, {})
+        mask = db.mask
+        distances = db.distances
+
+        choices = []
+        for typ, count in db.counts.items():
+            assert count <= block_count(tables, goal, typ), f"the goal has less than {count} blocks of type {typ}"
+            anchors = [anchor for anchor in tables.anchors_of[typ] if (tables.anchors(goal, typ) >> anchor) & 1]
+            choices.append([(typ, chosen) for chosen in itertools.combinations(anchors, count)])
+
+        frontier = []
+        for picks in itertools.product(*choices):
+            state = 0
+            for typ, chosen in picks:
+                for anchor in chosen:
+                    state = tables.place(state, typ, anchor)
+            distances[state & mask] = 0
+            frontier.append(state)
+
+        neighbours = tables.neighbours
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for current in frontier:
+                for new_state in neighbours(current):
+                    if new_state & mask not in distances:
+                        distances[new_state & mask] = distance
+                        next_frontier.append(new_state)
+                if len(distances) > max_states:
+                    # this layer is not whole, a placement missing from it is at least this far
+                    db.missing = distance
+                    return db
+            frontier = next_frontier
+        return db
+
+    @staticmethod
+    def load(path: Union[Path, str], tables: bitboard.Tables, goal: int) -> "PatternDB":
+        data = np.load(path)
+        pattern = tuple(data["pattern"].tolist())
+        distances = dict(zip(
+            (int.from_bytes(key.tobytes(), "little") for key in data["keys"]),
+            data["distances"].tolist(),
+        ))
+        return PatternDB(tables, pattern, goal, distances, int(data["missing"]))
+
+    def save(self, path: Union[Path, str]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        width = (self.mask.bit_length() + 7) // 8
+        keys = np.frombuffer(b"".join(key.to_bytes(width, "little") for key in self.distances), dtype=np.uint8)
+        assert max(self.distances.values(), default=0) <= np.iinfo(np.uint16).max, "a distance does not fit in a np.uint16"
+        np.savez(
+            path,
+            pattern=np.array(self.pattern, dtype=np.uint8),
+            keys=keys.reshape((len(self.distances), width)),
+            distances=np.fromiter(self.distances.values(), dtype=np.uint16, count=len(self.distances)),
+            missing=np.array(self.missing, dtype=np.uint32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.distances)
+
+    def nbytes(self) -> Tuple[int, int]:
+        """
+        :return: the size of the saved arrays and roughly what the dict takes in memory
+        """
+        width = (self.mask.bit_length() + 7) // 8
+        in_memory = sys.getsizeof(self.distances) + sum(sys.getsizeof(key) for key in self.distances)
+        return len(self) * (width + 2), in_memory
+
+    def distance(self, key: int) -> int:
+        """
+        :param key: the anchor fields of the pattern blocks, state & mask when the pattern has every block of its types
+        """
+        return self.distances.get(key, self.missing)
+
+
+def get_dbs(
+        tables: bitboard.Tables,
+        goal: int,
+        patterns: Optional[List[Tuple[int, ...]]]=None,
+        directory: Optional[Path]=None,
+        max_states: int=cfg.PATTERN_MAX_STATES
+) -> List[PatternDB]:
+    """
+    the databases of every pattern, loaded from directory when they were saved before
+    :param tables: bitboard.Tables
+    :param goal: the goal state
+    :param patterns: patterns that share no blocks, default_patterns when None
+    :param directory: where the databases are kept, like cfg.Paths.PATTERNS, None to never touch the disk
+    :param max_states: the most placements of a pattern
+    :return: List[PatternDB]
+    """
+    patterns = default_patterns(tables, goal, max_states) if patterns is None else patterns
+    dbs = []
+    for pattern in patterns:
+        path = None if directory is None else PatternDB.path_for(tables, pattern, goal, directory)
+        if path is not None and path.exists():
+            dbs.append(PatternDB.load(path, tables, goal))
+            continue
+        db = PatternDB.build(tables, pattern, goal, max_states)
+        if path is not None:
+            db.save(path)
+        dbs.append(db)
+    return dbs
+
+
+def estimate_for(dbs: List[PatternDB]) -> Callable[[int], int]:
+    """
+    the sum of the databases, the blocks of a type that is split over some of them are
+    given out in the order of their anchors
+    :param dbs: databases that share no blocks
+    :return: a function giving the estimate for a state
+    """
+    # shift of a split type -> how many of its blocks went to the databases before
+    given: Dict[int, int] = {}
+    # (the fields of the types a database has every block of, (shift, first, stop) of the split ones, distances, missing)
+    lookups = []
+    for db in dbs:
+        whole = 0
+        splits = []
+        for typ, count in db.counts.items():
+            shift = typ * db.tables.cells
+            if count == block_count(db.tables, db.goal, typ):
+                whole |= db.tables.full << shift
+                continue
+            first = given.get(shift, 0)
+            splits.append((shift, first, first + count))
+            given[shift] = first + count
+        lookups.append((whole, splits, db.distances, db.missing))
+
+    if not given:
+        def estimate(state: int) -> int:
+            total = 0
+            for whole, _, distances, missing in lookups:
+                total += distances.get(state & whole, missing)
+            return total
+
+        return estimate
+
+    full = dbs[0].tables.full
+
+    def estimate(state: int) -> int:
+        # shift -> the anchor bits of the blocks of the type from the lowest anchor up
+        anchors = {}
+        for shift in given:
+            field = (state >> shift) & full
+            bits = []
+            while field:
+                low = field & -field
+                bits.append(low << shift)
+                field ^= low
+            anchors[shift] = bits
+
+        total = 0
+        for whole, splits, distances, missing in lookups:
+            key = state & whole
+            for shift, first, stop in splits:
+                for bit in anchors[shift][first:stop]:
+                    key |= bit
+            total += distances.get(key, missing)
+        return total
+
+    return estimate
+
+
+def heuristic(tables: bitboard.Tables, goal: int, directory: Optional[Path]=None) -> Callable[[int], int]:
+    """
+    the sum of the default pattern databases, can be given to solver.solve like solver.manhattan,
+    functools.partial(heuristic, directory=cfg.Paths.PATTERNS) keeps the databases on disk
+    :param tables: bitboard.Tables
+    :param goal: int
+    :param directory: where the databases are kept, None to never touch the disk
+    :return: a function giving the estimate for a state
+    """
+    return estimate_for(get_dbs(tables, goal, directory=directory))
+
+
+def main() -> None:
+    import src.generator as generator
+
+    parser = argparse.ArgumentParser(description="compare the pattern database heuristic with the manhattan one")
+    parser.add_argument("--puzzles", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--method", default=solver.Methods.ASTAR, choices=[solver.Methods.ASTAR, solver.Methods.IDASTAR])
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    totals = {"manhattan": [0, 0.0], "patterns": [0, 0.0]}
+    for _ in range(args.puzzles):
+        puzzle = generator.generate(generator.gen_random_counts())
+        tables = bitboard.get_tables(*puzzle.start.shape)
+        goal = tables.from_array(puzzle.solution)
+
+        start_time = time.perf_counter()
+        dbs = get_dbs(tables, goal, directory=None)
+        build_time = time.perf_counter() - start_time
+        saved, in_memory = (sum(sizes) for sizes in zip(*(db.nbytes() for db in dbs)))
+
+        line = [f"distance {puzzle.distance:2}", f"{sum(len(db) for db in dbs):6} entries",
+                f"{saved / 1024:6.0f}KiB saved", f"{in_memory / 1024:6.0f}KiB in memory", f"built in {build_time:.2f}s"]
+        for name, factory in (("manhattan", solver.manhattan), ("patterns", heuristic)):
+            stats = solver.SearchStats()
+            moves = solver.solve(puzzle.start, puzzle.solution, args.method, stats=stats, heuristic=factory)
+            assert moves is not None and len(moves) == puzzle.distance, "the heuristic overestimated"
+            totals[name][0] += stats.expanded
+            totals[name][1] += stats.wall_time
+            line.append(f"{name} {stats.expanded:7} expanded {stats.wall_time:.2f}s")
+        print(", ".join(line))
+
+    manhattan, patterns = totals["manhattan"], totals["patterns"]
+    print(f"pattern databases expanded {patterns[0] / max(manhattan[0], 1):.1%} of the nodes manhattan did "
+          f"in {patterns[1] / max(manhattan[1], 1e-9):.1%} of the time")
+
+
+if __name__ == "__main__":
+    main()
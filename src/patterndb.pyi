@@ -0,0 +1,65 @@
+from typing import List, Dict, Optional, Union, Tuple, Callable
+
+from pathlib import Path
+
+import src.bitboard as bitboard
+
+import numpy as np
+
+
+VERSION: int
+UNREACHABLE: int
+GROUPS: Tuple[Tuple[int, ...], ...]
+
+
+def block_count(tables: bitboard.Tables, state: int, typ: int) -> int: ...
+# an upper bound, the blocks are allowed to overlap
+def placements(tables: bitboard.Tables, pattern: List[int]) -> int: ...
+# patterns that share no blocks, the groups of GROUPS split to fit in max_states placements
+def default_patterns(tables: bitboard.Tables, goal: int, max_states: int=...) -> List[Tuple[int, ...]]: ...
+
+
+class PatternDB:
+    tables: bitboard.Tables
+    pattern: Tuple[int, ...]
+    counts: Dict[int, int]
+    mask: int
+    goal: int
+    distances: Dict[int, int]
+    missing: int
+
+    def __init__(
+            self,
+            tables: bitboard.Tables,
+            pattern: Tuple[int, ...],
+            goal: int,
+            distances: Dict[int, int],
+            missing: int=...
+    ) -> None: ...
+    @staticmethod
+    def path_for(tables: bitboard.Tables, pattern: Tuple[int, ...], goal: int, directory: Path=...) -> Path: ...
+    # a bfs back from every way the pattern blocks can sit on the goal, cut off after max_states placements
+    @staticmethod
+    def build(tables: bitboard.Tables, pattern: Tuple[int, ...], goal: int, max_states: int=...) -> PatternDB: ...
+    @staticmethod
+    def load(path: Union[Path, str], tables: bitboard.Tables, goal: int) -> PatternDB: ...
+    def save(self, path: Union[Path, str]) -> None: ...
+    def __len__(self) -> int: ...
+    # the size of the saved arrays and roughly what the dict takes in memory
+    def nbytes(self) -> Tuple[int, int]: ...
+    def distance(self, key: int) -> int: ...
+
+
+# nothing is saved or loaded unless directory is given
+def get_dbs(
+        tables: bitboard.Tables,
+        goal: int,
+        patterns: Optional[List[Tuple[int, ...]]]=None,
+        directory: Optional[Path]=None,
+        max_states: int=...
+) -> List[PatternDB]: ...
+# the sum of the databases, a split type gives its blocks out in the order of their anchors
+def estimate_for(dbs: List[PatternDB]) -> Callable[[int], int]: ...
+# the sum of the default pattern databases, can be given to solver.solve like solver.manhattan
+def heuristic(tables: bitboard.Tables, goal: int, directory: Optional[Path]=None) -> Callable[[int], int]: ...
+def main() -> None: ...
@@ -0,0 +1,65 @@
+"""
+puzzles made ahead of time on a background thread
+
+the thread keeps a bounded queue of ready puzzles full so taking the next one is a
+queue pop instead of a search, only when the queue has run dry is a puzzle made
+on the spot
+"""
+
+from typing import Dict, Callable, Optional
+
+import src.config as cfg
+import src.generator as generator
+
+import threading
+import queue
+
+
+class PuzzleQueue:
+    def __init__(self, gen_counts: Callable[[], Dict[int, int]], size: int=cfg.PREFETCH_SIZE) -> None:
+        """
+        :param gen_counts: gives the block counts of every new puzzle
+        :param size: how many puzzles are kept ready
+        """
+        self.gen_counts: Callable[[], Dict[int, int]] = gen_counts
+        self.puzzles: queue.Queue = queue.Queue(maxsize=size)
+
+        self.stopped: threading.Event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.fill, name="puzzle-prefetch", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def fill(self) -> None:
+        while not self.stopped.is_set():
+            puzzle = generator.generate(self.gen_counts())
+            # waits while the queue is full, waking up now and then to see if it was stopped
+            while not self.stopped.is_set():
+                try:
+                    self.puzzles.put(puzzle, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self) -> generator.Puzzle:
+        """
+        the next ready puzzle, made right away if none is ready
+        :return: generator.Puzzle
+        """
+        try:
+            return self.puzzles.get_nowait()
+        except queue.Empty:
+            return generator.generate(self.gen_counts())
+
+    def __len__(self) -> int:
+        return self.puzzles.qsize()
@@ -0,0 +1,22 @@
+from typing import Dict, Callable, Optional
+
+import src.generator as generator
+
+import threading
+import queue
+
+
+class PuzzleQueue:
+    gen_counts: Callable[[], Dict[int, int]]
+    puzzles: queue.Queue
+    stopped: threading.Event
+    thread: Optional[threading.Thread]
+
+    def __init__(self, gen_counts: Callable[[], Dict[int, int]], size: int=...) -> None: ...
+    def start(self) -> None: ...
+    def stop(self) -> None: ...
+    # runs on the background thread
+    def fill(self) -> None: ...
+    # made right away if none is ready
+    def get(self) -> generator.Puzzle: ...
+    def __len__(self) -> int: ...
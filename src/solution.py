@@ -1,14 +1,15 @@
-from typing import Optional, Tuple, Callable, List, Union, Dict
+from typing import Optional, Tuple, List, Union, Dict, Type, Iterable
 
 
 import src.config as cfg
+import src.colors as colors
 import src.utils as utils
 import src.grid as grid
+import src.bitboard as bitboard
 
 import numpy as np
 
 import pygame
-import random
 
 
 class Blocks:
@@ -22,36 +23,96 @@ class Blocks:
 
     @classmethod
     def load(cls) -> None:
+        if cls.CODE:
+            return
         cls.CODE[cls.BLOCK_1x1] = utils.load_image(cfg.Paths.ASSETS / "1x1sqSolDis.png")
         cls.CODE[cls.BLOCK_2x1] = pygame.image.load(cfg.Paths.ASSETS / "2x1sqSolDis.png")
         cls.CODE[cls.BLOCK_1x2] = pygame.image.load(cfg.Paths.ASSETS / "1x2sqSolDis.png")
         cls.CODE[cls.BLOCK_2x2] = pygame.image.load(cfg.Paths.ASSETS / "2x2sqSolDis.png")
 
+    @classmethod
+    def image(cls, typ: int) -> pygame.Surface:
+        cls.load()
+        if typ not in cls.CODE:
+            cls.CODE[typ] = grid.Blocks.render(typ, int(cfg.SOL_TILE_SIZE.x), colors.green3)
+        return cls.CODE[typ]
 
-class Solution:
-    def __init__(self) -> None:
-        self._grid: grid.Grid = grid.Grid()
-        self.background: pygame.Surface = pygame.image.load(cfg.Paths.ASSETS / "solutiondisplay.png")
 
-        Blocks.load()
+class Solution:
+    # loaded or drawn the first time a solution of that size is drawn, like grid.Grid.grid_surface
+    _backgrounds: Dict[Tuple[int, int], pygame.Surface] = {}
+    # like grid.Grid._composites but with the small blocks
+    _composites: utils.SurfaceCache = utils.SurfaceCache(cfg.BOARD_CACHE_SIZE)
+
+    def __init__(
+            self,
+            rows: int=cfg.GRID_ROWS,
+            cols: int=cfg.GRID_COLS,
+            types: Iterable[int]=grid.Blocks.CLASSIC,
+            backend: Type[Union[grid.Grid, bitboard.BitGrid]]=grid.Grid
+    ) -> None:
+        self._grid: Union[grid.Grid, bitboard.BitGrid] = backend(rows, cols, types)
+        # the grid as it was the last time it was drawn
+        self._drawn: Optional[int] = None
+
+    @property
+    def rows(self) -> int:
+        return self._grid.rows
+
+    @property
+    def cols(self) -> int:
+        return self._grid.cols
+
+    @property
+    def types(self) -> Tuple[int, ...]:
+        return self._grid.types
+
+    @property
+    def background(self) -> pygame.Surface:
+        size = (self.rows, self.cols)
+        if size not in Solution._backgrounds:
+            if size == (cfg.GRID_ROWS, cfg.GRID_COLS):
+                Solution._backgrounds[size] = pygame.image.load(cfg.Paths.ASSETS / "solutiondisplay.png")
+            else:
+                Solution._backgrounds[size] = utils.draw_board(self.rows, self.cols, int(cfg.SOL_TILE_SIZE.x), colors.black, colors.black)
+        return Solution._backgrounds[size]
 
     def random_gen(self, counts: Dict[int, int]) -> None:
         self._grid.random_gen(counts)
 
-    def draw_to(self, surface: pygame.Surface) -> None:
+    def set(self, grid_: Union[np.ndarray, List[List[int]]], copy: bool=True) -> None:
+        self._grid.set(grid_, copy)
+
+    @property
+    def rect(self) -> pygame.Rect:
         sol_x: int = 20
         sol_y: int = (int(cfg.UTIL_BAR_HEIGHT // 2)) - int(self.background.get_height() // 2)
+        return self.background.get_rect(topleft=(sol_x, sol_y))
 
-        surface.blit(self.background, (sol_x, sol_y))
+    def draw_dirty_to(self, surface: pygame.Surface) -> List[pygame.Rect]:
+        if self._drawn == self._grid.key:
+            return []
+        self.draw_to(surface)
+        return [self.rect]
+
+    def composite(self) -> pygame.Surface:
+        composite = self.background.copy()
 
         for rowi, row in enumerate(self._grid.get_grid()):
             for coli, value in enumerate(row):
                 if value == 0:
                     continue
 
-                x = (sol_x + 1 + coli) + coli * cfg.SOL_TILE_SIZE.x
-                y = (sol_y + 1 + rowi) + rowi * cfg.SOL_TILE_SIZE.y
-                surface.blit(Blocks.CODE[value], (x, y))
+                coli += grid.Blocks.LEFT[value]
+                x = (1 + coli) + coli * cfg.SOL_TILE_SIZE.x
+                y = (1 + rowi) + rowi * cfg.SOL_TILE_SIZE.y
+                composite.blit(Blocks.image(value), (x, y))
+
+        return composite
+
+    def draw_to(self, surface: pygame.Surface) -> None:
+        self._drawn = self._grid.key
+        surface.blit(Solution._composites.get((self.rows, self.cols, self._drawn), self.composite), self.rect)
 
     def draw(self) -> None:
         self.draw_to(cfg.get_main_surface())
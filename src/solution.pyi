@@ -1,6 +1,8 @@
-from typing import Dict
+from typing import Dict, Type, Union, List, Optional, Tuple, Iterable
 
 import src.grid as grid
+import src.utils as utils
+import src.bitboard as bitboard
 
 import numpy as np
 
@@ -18,15 +20,42 @@ class Blocks:
 
     @classmethod
     def load(cls) -> None: ...
+    # shapes without an image get drawn with grid.Blocks.render
+    @classmethod
+    def image(cls, typ: int) -> pygame.Surface: ...
 
 
 class Solution:
-    _grid: grid.Grid
-    background: pygame.Surface
-
-    def __init__(self) -> None: ...
+    _grid: Union[grid.Grid, bitboard.BitGrid]
+    _backgrounds: Dict[Tuple[int, int], pygame.Surface]
+    _drawn: Optional[int]
+    _composites: utils.SurfaceCache
+
+    def __init__(
+            self,
+            rows: int=...,
+            cols: int=...,
+            types: Iterable[int]=...,
+            backend: Type[Union[grid.Grid, bitboard.BitGrid]]=grid.Grid
+    ) -> None: ...
+    @property
+    def rows(self) -> int: ...
+    @property
+    def cols(self) -> int: ...
+    @property
+    def types(self) -> Tuple[int, ...]: ...
+    # loaded or drawn the first time a solution of that size is drawn
+    @property
+    def background(self) -> pygame.Surface: ...
 
     def random_gen(self, counts: Dict[int, int]) -> None: ...
+    def set(self, grid_: Union[np.ndarray, List[List[int]]], copy: bool=True) -> None: ...
+    @property
+    def rect(self) -> pygame.Rect: ...
+    # redraws the solution if it changed since it was last drawn and returns the part of the screen it covers
+    def draw_dirty_to(self, surface: pygame.Surface) -> List[pygame.Rect]: ...
+    # the background with the blocks on it
+    def composite(self) -> pygame.Surface: ...
     def draw_to(self, surface: pygame.Surface) -> None: ...
     def draw(self) -> None: ...
     def get_grid(self) -> np.ndarray: ...
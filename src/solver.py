@@ -0,0 +1,483 @@
+"""
+finds the shortest list of moves from one board to another
+
+boards can be a grid.Grid, a bitboard.BitGrid or a plain array, the search itself
+runs on bitboard states so every visited board costs one int in a dict
+
+a move is (row, col, direction), row-col being the topleft of the block before the
+move and direction one of grid.Directions.*, so it can be replayed with Grid.move
+
+with Metrics.SLIDES a block sliding any number of cells in one direction is a single
+move and the moves are (row, col, direction, steps) for Grid.slide instead
+"""
+
+from typing import List, Dict, Optional, Union, Tuple, Callable
+
+import src.grid as grid
+import src.bitboard as bitboard
+
+import numpy as np
+
+import collections
+import heapq
+import time
+
+
+Board = Union[grid.Grid, bitboard.BitGrid, np.ndarray, List[List[int]]]
+# makes the estimate for a goal, like manhattan
+Heuristic = Callable[[bitboard.Tables, int], Callable[[int], int]]
+Move = Tuple[int, int, int]
+Slide = Tuple[int, int, int, int]
+
+
+class Methods:
+    BFS: str = "bfs"
+    ASTAR: str = "astar"
+    IDASTAR: str = "idastar"
+    BIDIRECTIONAL: str = "bidirectional"
+
+
+class Metrics:
+    MOVES: str = "moves"
+    SLIDES: str = "slides"
+
+
+class SearchStats:
+    def __init__(self) -> None:
+        self.expanded: int = 0
+        self.visited: int = 0
+        self.peak_frontier: int = 0
+        self.wall_time: float = 0
+
+    def __repr__(self) -> str:
+        return f"solver.SearchStats(expanded={self.expanded}, visited={self.visited}, " \
+               f"peak_frontier={self.peak_frontier}, wall_time={self.wall_time:.4f})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def board_shape(board: Board) -> Tuple[int, int]:
+    if isinstance(board, (grid.Grid, bitboard.BitGrid)):
+        return board.rows, board.cols
+    return np.array(board).shape
+
+
+def board_types(board: Board) -> Tuple[int, ...]:
+    if isinstance(board, (grid.Grid, bitboard.BitGrid)):
+        return board.types
+    return grid.Blocks.types_for(np.unique(np.asarray(board)).tolist())
+
+
+def to_state(board: Board, tables: bitboard.Tables) -> int:
+    # the state and the key can only be used as they are when they were made with the same tables
+    if isinstance(board, bitboard.BitGrid):
+        return board.state if board.tables is tables else tables.from_array(board.get_grid())
+    if isinstance(board, grid.Grid):
+        return board.state if board.tables is tables else tables.from_array(board.get_grid())
+    return tables.from_array(np.array(board))
+
+
+def move_between(tables: bitboard.Tables, state: int, new_state: int) -> Move:
+    changed = state ^ new_state
+    for typ in tables.types:
+        anchors = tables.anchors(changed, typ)
+        if not anchors:
+            continue
+        old = tables.anchors(state, typ) & anchors
+        new = anchors ^ old
+        old_row, old_col = divmod(old.bit_length() - 1, tables.cols)
+        new_row, new_col = divmod(new.bit_length() - 1, tables.cols)
+        return old_row, old_col, tables.delta.index((new_row - old_row, new_col - old_col))
+    raise ValueError("the states are the same")
+
+
+def slide_between(tables: bitboard.Tables, state: int, new_state: int) -> Slide:
+    changed = state ^ new_state
+    for typ in tables.types:
+        anchors = tables.anchors(changed, typ)
+        if not anchors:
+            continue
+        old = tables.anchors(state, typ) & anchors
+        new = anchors ^ old
+        old_row, old_col = divmod(old.bit_length() - 1, tables.cols)
+        new_row, new_col = divmod(new.bit_length() - 1, tables.cols)
+        d_row, d_col = new_row - old_row, new_col - old_col
+        steps = abs(d_row) + abs(d_col)
+        return old_row, old_col, tables.delta.index((d_row // steps, d_col // steps)), steps
+    raise ValueError("the states are the same")
+
+
+def neighbours_for(tables: bitboard.Tables, metric: str) -> Callable[[int], List[int]]:
+    if metric == Metrics.MOVES:
+        return tables.neighbours
+    if metric == Metrics.SLIDES:
+        return tables.slide_neighbours
+    raise ValueError(f"unknown metric: {metric}")
+
+
+def path_to(
+        tables: bitboard.Tables,
+        parents: Dict[int, int],
+        state: int,
+        metric: str=Metrics.MOVES,
+        key: Optional[Callable[[int], int]]=None
+) -> List[Union[Move, Slide]]:
+    """
+    :param key: what parents is keyed by when it is not the state itself
+    """
+    between = move_between if metric == Metrics.MOVES else slide_between
+    key = key if key is not None else int
+    states = [state]
+    while parents[key(states[-1])] != states[-1]:
+        states.append(parents[key(states[-1])])
+    states.reverse()
+    return [between(tables, a, b) for a, b in zip(states, states[1:])]
+
+
+def path_from(tables: bitboard.Tables, children: Dict[int, int], state: int, metric: str=Metrics.MOVES) -> List[Union[Move, Slide]]:
+    between = move_between if metric == Metrics.MOVES else slide_between
+    states = [state]
+    while children[states[-1]] != states[-1]:
+        states.append(children[states[-1]])
+    return [between(tables, a, b) for a, b in zip(states, states[1:])]
+
+
+def same_blocks(tables: bitboard.Tables, start: int, goal: int) -> bool:
+    for typ in tables.types:
+        if bin(tables.anchors(start, typ)).count("1") != bin(tables.anchors(goal, typ)).count("1"):
+            return False
+    return True
+
+
+def manhattan(tables: bitboard.Tables, goal: int) -> Callable[[int], int]:
+    """
+    sum of the distances of every block to the closest topleft of a block of the
+    same type in the goal, a block moves one cell per move so it never overestimates
+    :param tables: bitboard.Tables
+    :param goal: int
+    :return: a function giving the estimate for a state
+    """
+    closest: Dict[int, List[int]] = {}
+    for typ in tables.types:
+        goals = [divmod(anchor, tables.cols) for anchor in range(tables.cells) if (tables.anchors(goal, typ) >> anchor) & 1]
+        closest[typ] = [
+            min((abs(row - g_row) + abs(col - g_col) for g_row, g_col in goals), default=0)
+            for row, col in (divmod(anchor, tables.cols) for anchor in range(tables.cells))
+        ]
+
+    def estimate(state: int) -> int:
+        total = 0
+        for typ in tables.types:
+            anchors = tables.anchors(state, typ)
+            distances = closest[typ]
+            while anchors:
+                low = anchors & -anchors
+                total += distances[low.bit_length() - 1]
+                anchors ^= low
+        return total
+
+    return estimate
+
+
+def misplaced(tables: bitboard.Tables, goal: int) -> Callable[[int], int]:
+    """
+    the number of blocks that are not on the topleft of a block of the same type in
+    the goal, each of them needs at least one slide so it never overestimates
+    :param tables: bitboard.Tables
+    :param goal: int
+    :return: a function giving the estimate for a state
+    """
+    goals = [(typ * tables.cells, tables.anchors(goal, typ)) for typ in tables.types]
+
+    def estimate(state: int) -> int:
+        return sum(bin((state >> shift) & tables.full & ~anchors).count("1") for shift, anchors in goals)
+
+    return estimate
+
+
+def default_heuristic(tables: bitboard.Tables, goal: int, metric: str=Metrics.MOVES) -> Callable[[int], int]:
+    # a slide can take a block many cells at once, so the manhattan sum would overestimate
+    return manhattan(tables, goal) if metric == Metrics.MOVES else misplaced(tables, goal)
+
+
+def bfs(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=Metrics.MOVES
+) -> Optional[List[Union[Move, Slide]]]:
+    """
+    when the goal is its own mirror image a board and its mirror image are the same
+    number of moves from it, so only the canonical form of every board is kept and the
+    one that was reached first stands for both
+    """
+    stats = stats if stats is not None else SearchStats()
+    key = tables.canonical if tables.mirror_shifts is not None and tables.mirror(goal) == goal else int
+    # canonical form -> the board it was reached from, the queue keeps the boards themselves
+    parents: Dict[int, int] = {key(start): start}
+    queue = collections.deque([start])
+    neighbours = neighbours_for(tables, metric)
+
+    while queue:
+        stats.peak_frontier = max(stats.peak_frontier, len(queue))
+        state = queue.popleft()
+        if state == goal:
+            stats.visited = len(parents)
+            return path_to(tables, parents, goal, metric, key)
+
+        stats.expanded += 1
+        for new_state in neighbours(state):
+            new_key = key(new_state)
+            if new_key not in parents:
+                parents[new_key] = state
+                queue.append(new_state)
+
+        if max_states is not None and len(parents) > max_states:
+            break
+
+    stats.visited = len(parents)
+    return None
+
+
+def astar(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        heuristic: Optional[Callable[[int], int]]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=Metrics.MOVES
+) -> Optional[List[Union[Move, Slide]]]:
+    stats = stats if stats is not None else SearchStats()
+    estimate = heuristic if heuristic is not None else default_heuristic(tables, goal, metric)
+
+    parents: Dict[int, int] = {start: start}
+    costs: Dict[int, int] = {start: 0}
+    # the counter keeps the heap from comparing states when the costs tie
+    counter = 0
+    heap = [(estimate(start), counter, start)]
+    closed = set()
+    neighbours = neighbours_for(tables, metric)
+
+    while heap:
+        stats.peak_frontier = max(stats.peak_frontier, len(heap))
+        _, _, state = heapq.heappop(heap)
+        if state == goal:
+            stats.visited = len(costs)
+            return path_to(tables, parents, goal, metric)
+        if state in closed:
+            continue
+        closed.add(state)
+
+        stats.expanded += 1
+        cost = costs[state] + 1
+        for new_state in neighbours(state):
+            if cost < costs.get(new_state, cost + 1):
+                costs[new_state] = cost
+                parents[new_state] = state
+                # a heuristic that is admissible but not consistent can find a shorter way to a closed state
+                closed.discard(new_state)
+                counter += 1
+                heapq.heappush(heap, (cost + estimate(new_state), counter, new_state))
+
+        if max_states is not None and len(costs) > max_states:
+            break
+
+    stats.visited = len(costs)
+    return None
+
+
+def bidirectional(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=Metrics.MOVES
+) -> Optional[List[Union[Move, Slide]]]:
+    """
+    a bfs from both ends at once, every move can be undone so the boards next to the
+    goal are found with the same neighbours as the ones next to the start, the side
+    with the smaller frontier grows by a whole layer at a time and the search stops
+    at the end of the first layer that touches the other side
+    """
+    stats = stats if stats is not None else SearchStats()
+    if start == goal:
+        stats.visited = 1
+        return []
+
+    forward: Dict[int, int] = {start: start}
+    backward: Dict[int, int] = {goal: goal}
+    forward_frontier = [start]
+    backward_frontier = [goal]
+    neighbours = neighbours_for(tables, metric)
+
+    while forward_frontier and backward_frontier:
+        stats.peak_frontier = max(stats.peak_frontier, len(forward_frontier) + len(backward_frontier))
+
+        grow_forward = len(forward_frontier) <= len(backward_frontier)
+        frontier, parents, other = (forward_frontier, forward, backward) if grow_forward else (backward_frontier, backward, forward)
+
+        next_frontier = []
+        meeting = None
+        for state in frontier:
+            stats.expanded += 1
+            for new_state in neighbours(state):
+                if new_state in parents:
+                    continue
+                parents[new_state] = state
+                next_frontier.append(new_state)
+                # the first meeting of a layer is as short as any other from that layer
+                if meeting is None and new_state in other:
+                    meeting = new_state
+
+        if grow_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+        if meeting is not None:
+            stats.visited = len(forward) + len(backward)
+            return path_to(tables, forward, meeting, metric) + path_from(tables, backward, meeting, metric)
+
+        if max_states is not None and len(forward) + len(backward) > max_states:
+            break
+
+    stats.visited = len(forward) + len(backward)
+    return None
+
+
+def idastar(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        heuristic: Optional[Callable[[int], int]]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=Metrics.MOVES
+) -> Optional[List[Union[Move, Slide]]]:
+    """
+    depth first searches with a growing bound on moves made + estimate, only the current
+    path is kept so it needs almost no memory but finds the same boards again and again
+    unless the heuristic is good, max_states limits how many boards get expanded
+    """
+    stats = stats if stats is not None else SearchStats()
+    estimate = heuristic if heuristic is not None else default_heuristic(tables, goal, metric)
+    neighbours = neighbours_for(tables, metric)
+
+    path = [start]
+    on_path = {start}
+    found = -1
+
+    def search(cost: int, bound: int) -> int:
+        state = path[-1]
+        total = cost + estimate(state)
+        if total > bound:
+            return total
+        if state == goal:
+            return found
+        if max_states is not None and stats.expanded > max_states:
+            return bitboard_unreachable
+
+        stats.expanded += 1
+        stats.peak_frontier = max(stats.peak_frontier, len(path))
+        smallest = bitboard_unreachable
+        for new_state in neighbours(state):
+            if new_state in on_path:
+                continue
+            path.append(new_state)
+            on_path.add(new_state)
+            result = search(cost + 1, bound)
+            if result == found:
+                return found
+            smallest = min(smallest, result)
+            path.pop()
+            on_path.remove(new_state)
+        return smallest
+
+    # larger than any bound a real search can reach
+    bitboard_unreachable = 1 << 62
+    bound = estimate(start)
+    while bound < bitboard_unreachable:
+        bound = search(0, bound)
+        if bound == found:
+            stats.visited = stats.expanded
+            between = move_between if metric == Metrics.MOVES else slide_between
+            return [between(tables, a, b) for a, b in zip(path, path[1:])]
+
+    stats.visited = stats.expanded
+    return None
+
+
+def solve(
+        start: Board,
+        goal: Board,
+        method: str=Methods.BIDIRECTIONAL,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=Metrics.MOVES,
+        heuristic: Optional[Heuristic]=None
+) -> Optional[List[Union[Move, Slide]]]:
+    """
+    the shortest list of moves that turns start into goal
+    :param start: the board to start from
+    :param goal: the board to reach
+    :param method: one of Methods.*
+    :param max_states: give up after visiting this many boards
+    :param stats: filled with the counts and the time the search took
+    :param metric: one of Metrics.*, what counts as a single move
+    :param heuristic: makes the estimate for Methods.ASTAR and Methods.IDASTAR, like
+                      manhattan or patterndb.heuristic, it must never overestimate
+    :return: the moves or None if goal can not be reached
+    """
+    assert board_shape(start) == board_shape(goal), f"board shape {board_shape(start)} != {board_shape(goal)}"
+    stats = stats if stats is not None else SearchStats()
+    start_time = time.perf_counter()
+
+    tables = bitboard.get_tables(*board_shape(start), set(board_types(start)) | set(board_types(goal)))
+    start_state = to_state(start, tables)
+    goal_state = to_state(goal, tables)
+
+    moves = None
+    if not same_blocks(tables, start_state, goal_state):
+        pass
+    elif method == Methods.BFS:
+        moves = bfs(tables, start_state, goal_state, max_states, stats, metric)
+    elif method in (Methods.ASTAR, Methods.IDASTAR):
+        estimate = None if heuristic is None else heuristic(tables, goal_state)
+        search = astar if method == Methods.ASTAR else idastar
+        moves = search(tables, start_state, goal_state, max_states, estimate, stats, metric)
+    elif method == Methods.BIDIRECTIONAL:
+        moves = bidirectional(tables, start_state, goal_state, max_states, stats, metric)
+    else:
+        raise ValueError(f"unknown method: {method}")
+
+    stats.wall_time = time.perf_counter() - start_time
+    return moves
+
+
+def distance(
+        start: Board,
+        goal: Board,
+        method: str=Methods.BIDIRECTIONAL,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=Metrics.MOVES,
+        heuristic: Optional[Heuristic]=None
+) -> Optional[int]:
+    moves = solve(start, goal, method, max_states, stats, metric, heuristic)
+    return None if moves is None else len(moves)
+
+
+def apply(board: Union[grid.Grid, bitboard.BitGrid], moves: List[Union[Move, Slide]]) -> bool:
+    for move in moves:
+        if len(move) == 4:
+            row, col, direction, steps = move
+            if len(board.slide(row, col, direction, steps)) != steps:
+                return False
+        elif not board.move(*move):
+            return False
+    return True
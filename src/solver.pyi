@@ -0,0 +1,118 @@
+from typing import List, Dict, Optional, Union, Tuple, Callable
+
+import src.grid as grid
+import src.bitboard as bitboard
+
+import numpy as np
+
+
+Board = Union[grid.Grid, bitboard.BitGrid, np.ndarray, List[List[int]]]
+# (row, col, direction) the topleft of the block before the move and one of grid.Directions.*
+Move = Tuple[int, int, int]
+# (row, col, direction, steps) the same with how many cells the block slides
+Slide = Tuple[int, int, int, int]
+# makes the estimate for a goal, like manhattan
+Heuristic = Callable[[bitboard.Tables, int], Callable[[int], int]]
+
+
+class Methods:
+    BFS: str
+    ASTAR: str
+    IDASTAR: str
+    BIDIRECTIONAL: str
+
+
+class Metrics:
+    MOVES: str
+    SLIDES: str
+
+
+class SearchStats:
+    expanded: int
+    visited: int
+    peak_frontier: int
+    wall_time: float
+
+    def __init__(self) -> None: ...
+    def __repr__(self) -> str: ...
+    def __str__(self) -> str: ...
+
+
+def board_shape(board: Board) -> Tuple[int, int]: ...
+# the block types a board can hold
+def board_types(board: Board) -> Tuple[int, ...]: ...
+def to_state(board: Board, tables: bitboard.Tables) -> int: ...
+def move_between(tables: bitboard.Tables, state: int, new_state: int) -> Move: ...
+def slide_between(tables: bitboard.Tables, state: int, new_state: int) -> Slide: ...
+# tables.neighbours or tables.slide_neighbours
+def neighbours_for(tables: bitboard.Tables, metric: str) -> Callable[[int], List[int]]: ...
+# key is what parents is keyed by when it is not the state itself
+def path_to(
+        tables: bitboard.Tables,
+        parents: Dict[int, int],
+        state: int,
+        metric: str=...,
+        key: Optional[Callable[[int], int]]=None
+) -> List[Union[Move, Slide]]: ...
+def path_from(tables: bitboard.Tables, children: Dict[int, int], state: int, metric: str=...) -> List[Union[Move, Slide]]: ...
+def same_blocks(tables: bitboard.Tables, start: int, goal: int) -> bool: ...
+def manhattan(tables: bitboard.Tables, goal: int) -> Callable[[int], int]: ...
+# admissible for Metrics.SLIDES
+def misplaced(tables: bitboard.Tables, goal: int) -> Callable[[int], int]: ...
+# manhattan for Metrics.MOVES and misplaced for Metrics.SLIDES
+def default_heuristic(tables: bitboard.Tables, goal: int, metric: str=...) -> Callable[[int], int]: ...
+def bfs(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=...
+) -> Optional[List[Union[Move, Slide]]]: ...
+def astar(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        heuristic: Optional[Callable[[int], int]]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=...
+) -> Optional[List[Union[Move, Slide]]]: ...
+# iterative deepening A*, only keeps the current path
+def idastar(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        heuristic: Optional[Callable[[int], int]]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=...
+) -> Optional[List[Union[Move, Slide]]]: ...
+def bidirectional(
+        tables: bitboard.Tables,
+        start: int,
+        goal: int,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=...
+) -> Optional[List[Union[Move, Slide]]]: ...
+def solve(
+        start: Board,
+        goal: Board,
+        method: str=...,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=...,
+        heuristic: Optional[Heuristic]=None
+) -> Optional[List[Union[Move, Slide]]]: ...
+def distance(
+        start: Board,
+        goal: Board,
+        method: str=...,
+        max_states: Optional[int]=None,
+        stats: Optional[SearchStats]=None,
+        metric: str=...,
+        heuristic: Optional[Heuristic]=None
+) -> Optional[int]: ...
+# Move is replayed with board.move and Slide with board.slide
+def apply(board: Union[grid.Grid, bitboard.BitGrid], moves: List[Union[Move, Slide]]) -> bool: ...
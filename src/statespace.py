@@ -0,0 +1,293 @@
+"""
+every layout a set of blocks can be in and which of them can reach each other
+
+the layouts of one count signature are enumerated once, split into connected
+components under the grid moves and saved as a directory holding keys.npy, the
+sorted bitboard.Tables.pack of every layout, and components.npy, the component of
+every key
+
+two boards can be turned into each other when they have the same component, so
+checking it is a binary search in a memory mapped file instead of a search
+
+when the blocks have mirror images on the board only bitboard.Tables.canonical layouts
+are kept, which is about half of them, the mirror image of a component is a component
+too so mirrors.npy holds the component of the mirror image of every component and a
+layout that is not canonical has the mirror of the component of its mirror image,
+sizes.npy holds how many layouts every component really has
+
+run it with
+    python -m src.statespace
+to build the files for every signature generator.gen_random_counts can give
+"""
+
+from typing import List, Dict, Optional, Union, Iterator, Tuple
+
+import src.config as cfg
+import src.grid as grid
+import src.bitboard as bitboard
+import src.solver as solver
+import src.generator as generator
+
+import numpy as np
+
+from pathlib import Path
+import argparse
+import collections
+import random
+import time
+
+
+def signature_name(counts: Dict[int, int]) -> str:
+    return "-".join(f"{typ}x{counts.get(typ, 0)}" for typ in grid.Blocks.types_for(counts))
+
+
+def enumerate_states(tables: bitboard.Tables, counts: Dict[int, int], canonical: bool=False) -> Iterator[int]:
+    """
+    every layout of the blocks exactly once, blocks of the same type are
+    interchangeable so each one only goes after the anchor of the one before it
+    :param tables: bitboard.Tables
+    :param counts: a pair of Blocks.BLOCK_* and the count of each one
+    :param canonical: only the layouts tables.canonical keeps
+    :return: the bitboard states
+    """
+    canonical = canonical and tables.mirror_shifts is not None
+    blocks = []
+    for typ in sorted(counts):
+        blocks += [typ] * counts[typ]
+
+    # (index of the next block, state, index in anchors_of to start from)
+    stack = [(0, 0, 0)]
+    while stack:
+        i, state, first = stack.pop()
+        if i == len(blocks):
+            if not canonical or state <= tables.mirror(state):
+                yield state
+            continue
+
+        typ = blocks[i]
+        anchors = tables.anchors_of[typ]
+        occupancy = state & tables.full
+        for j in range(first, len(anchors)):
+            if tables.footprint[typ][anchors[j]] & occupancy:
+                continue
+            same_next = i + 1 < len(blocks) and blocks[i + 1] == typ
+            stack.append((i + 1, tables.place(state, typ, anchors[j]), j + 1 if same_next else 0))
+
+
+def label_components(tables: bitboard.Tables, states: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :param tables: bitboard.Tables
+    :param states: every layout of one signature
+    :return: the packed layouts sorted and the component of each one
+    """
+    component_of: Dict[int, int] = dict.fromkeys(states, -1)
+    neighbours = tables.neighbours
+    component = 0
+
+    for state in states:
+        if component_of[state] != -1:
+            continue
+        component_of[state] = component
+        queue = collections.deque([state])
+        while queue:
+            for new_state in neighbours(queue.popleft()):
+                if component_of[new_state] == -1:
+                    component_of[new_state] = component
+                    queue.append(new_state)
+        component += 1
+
+    keys = np.array([tables.pack(state) for state in component_of], dtype=np.uint64)
+    components = np.array(list(component_of.values()), dtype=np.uint32)
+    order = np.argsort(keys)
+    return keys[order], components[order]
+
+
+def label_canonical_components(tables: bitboard.Tables, states: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    label_components for the canonical layouts alone
+
+    the bfs walks the real layouts of one component but only keeps the canonical form of
+    each, flipped says when that is the mirror image of the layout the bfs is at, so the
+    canonical layout is in the mirror image of the component, the component is its own
+    mirror image when a canonical layout shows up both ways
+    :param tables: bitboard.Tables
+    :param states: every canonical layout of one signature
+    :return: the packed layouts sorted, the component of each one, the component of
+             the mirror image of every component and how many layouts every component has
+    """
+    component_of: Dict[int, int] = dict.fromkeys(states, -1)
+    neighbours = tables.mirrored_neighbours
+    mirror = tables.mirror
+    mirrors: List[int] = []
+    sizes: List[int] = []
+
+    for state in states:
+        if component_of[state] != -1:
+            continue
+        component = len(mirrors)
+        flipped = {state: False}
+        # a layout that is its own mirror image puts its component in both
+        symmetric = mirror(state) == state
+        queue = collections.deque([(state, mirror(state))])
+        while queue:
+            for new_state, mirrored in neighbours(*queue.popleft()):
+                is_flipped = mirrored < new_state
+                canonical = mirrored if is_flipped else new_state
+                if canonical not in flipped:
+                    flipped[canonical] = is_flipped
+                    queue.append((new_state, mirrored))
+                elif flipped[canonical] != is_flipped or mirrored == new_state:
+                    symmetric = True
+
+        if symmetric:
+            mirrors.append(component)
+            sizes.append(0)
+            for canonical in flipped:
+                component_of[canonical] = component
+                sizes[component] += 1 if mirror(canonical) == canonical else 2
+        else:
+            mirrors += [component + 1, component]
+            sizes += [len(flipped), len(flipped)]
+            for canonical, is_flipped in flipped.items():
+                component_of[canonical] = component + is_flipped
+
+    keys = np.array([tables.pack(state) for state in component_of], dtype=np.uint64)
+    components = np.array(list(component_of.values()), dtype=np.uint32)
+    order = np.argsort(keys)
+    return keys[order], components[order], np.array(mirrors, dtype=np.uint32), np.array(sizes, dtype=np.uint64)
+
+
+class ReachabilityDB:
+    def __init__(
+            self,
+            keys: np.ndarray,
+            components: np.ndarray,
+            rows: int=cfg.GRID_ROWS,
+            cols: int=cfg.GRID_COLS,
+            types: Optional[Tuple[int, ...]]=None,
+            mirrors: Optional[np.ndarray]=None,
+            sizes: Optional[np.ndarray]=None
+    ) -> None:
+        """
+        :param keys: the packed layouts sorted
+        :param components: the component of every key
+        :param rows: int
+        :param cols: int
+        :param types: the block types of the layouts
+        :param mirrors: the component of the mirror image of every component when only
+                        the canonical layouts are in keys, None when every layout is
+        :param sizes: how many layouts every component has, needed with mirrors
+        """
+        self.keys: np.ndarray = keys
+        self.components: np.ndarray = components
+        self.tables: bitboard.Tables = bitboard.get_tables(rows, cols, types)
+        self.mirrors: Optional[np.ndarray] = mirrors
+        self.sizes: Optional[np.ndarray] = sizes
+
+    @staticmethod
+    def path_for(counts: Dict[int, int], directory: Path=cfg.Paths.STATESPACE) -> Path:
+        return directory / signature_name(counts)
+
+    @staticmethod
+    def build(counts: Dict[int, int], rows: int=cfg.GRID_ROWS, cols: int=cfg.GRID_COLS, canonical: bool=True) -> "ReachabilityDB":
+        """
+        :param counts: a pair of Blocks.BLOCK_* and the count of each one
+        :param rows: int
+        :param cols: int
+        :param canonical: only keep the canonical layouts when the blocks have mirror images
+        :return: ReachabilityDB
+        """
+        types = grid.Blocks.types_for(counts)
+        tables = bitboard.get_tables(rows, cols, types)
+        assert tables.bits_per_cell * tables.cells <= 64, "the packed layouts do not fit in a np.uint64"
+        if canonical and tables.mirror_shifts is not None:
+            keys, components, mirrors, sizes = label_canonical_components(tables, list(enumerate_states(tables, counts, True)))
+            return ReachabilityDB(keys, components, rows, cols, types, mirrors, sizes)
+        return ReachabilityDB(*label_components(tables, list(enumerate_states(tables, counts))), rows, cols, types)
+
+    @staticmethod
+    def load(
+            path: Union[Path, str],
+            rows: int=cfg.GRID_ROWS,
+            cols: int=cfg.GRID_COLS,
+            types: Optional[Tuple[int, ...]]=None
+    ) -> "ReachabilityDB":
+        path = Path(path)
+        canonical = (path / "mirrors.npy").exists()
+        return ReachabilityDB(
+            np.load(path / "keys.npy", mmap_mode="r"),
+            np.load(path / "components.npy", mmap_mode="r"),
+            rows,
+            cols,
+            types,
+            np.load(path / "mirrors.npy") if canonical else None,
+            np.load(path / "sizes.npy") if canonical else None,
+        )
+
+    def save(self, path: Union[Path, str]) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "keys.npy", self.keys)
+        np.save(path / "components.npy", self.components)
+        for name in ("mirrors", "sizes"):
+            if getattr(self, name) is not None:
+                np.save(path / f"{name}.npy", getattr(self, name))
+            elif (path / f"{name}.npy").exists():
+                (path / f"{name}.npy").unlink()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def component(self, board: solver.Board) -> Optional[int]:
+        state = solver.to_state(board, self.tables)
+        canonical = state if self.mirrors is None else self.tables.canonical(state)
+        key = self.tables.pack(canonical)
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index == len(self.keys) or int(self.keys[index]) != key:
+            return None
+        component = int(self.components[index])
+        return component if canonical == state else int(self.mirrors[component])
+
+    def reachable(self, start: solver.Board, goal: solver.Board) -> bool:
+        component = self.component(start)
+        return component is not None and component == self.component(goal)
+
+    def component_sizes(self) -> np.ndarray:
+        return np.bincount(self.components) if self.mirrors is None else np.asarray(self.sizes)
+
+    def random_in(self, component: int) -> np.ndarray:
+        """
+        a random layout from a component
+        :param component: int
+        :return: the layout as a grid array
+        """
+        if self.mirrors is None:
+            indices = np.flatnonzero(self.components == component)
+        else:
+            # the rest of the component are the mirror images of layouts in its mirror image
+            indices = np.flatnonzero((self.components == component) | (self.components == self.mirrors[component]))
+        index = random.choice(indices)
+        state = self.tables.unpack(int(self.keys[index]))
+        if self.components[index] != component:
+            state = self.tables.mirror(state)
+        return self.tables.to_array(state)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="enumerate every layout and label what can reach what")
+    parser.add_argument("--out", type=Path, default=cfg.Paths.STATESPACE, help="the directory to write the .npy files to")
+    args = parser.parse_args()
+
+    for counts in generator.possible_counts():
+        start_time = time.perf_counter()
+        db = ReachabilityDB.build(counts)
+        path = ReachabilityDB.path_for(counts, args.out)
+        db.save(path)
+
+        sizes = db.component_sizes()
+        print(f"{path.name}: {len(db)} layouts, {len(sizes)} components, "
+              f"largest {sizes.max()}, {time.perf_counter() - start_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from typing import List, Dict, Optional, Union, Iterator, Tuple
+
+from pathlib import Path
+
+import src.bitboard as bitboard
+import src.solver as solver
+
+import numpy as np
+
+
+def signature_name(counts: Dict[int, int]) -> str: ...
+# every layout of the blocks exactly once as bitboard states
+def enumerate_states(tables: bitboard.Tables, counts: Dict[int, int], canonical: bool=False) -> Iterator[int]: ...
+# the packed layouts sorted and the component of each one
+def label_components(tables: bitboard.Tables, states: List[int]) -> Tuple[np.ndarray, np.ndarray]: ...
+# the same for canonical layouts, also the mirror image of every component and the size of every component
+def label_canonical_components(tables: bitboard.Tables, states: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: ...
+
+
+class ReachabilityDB:
+    keys: np.ndarray
+    components: np.ndarray
+    tables: bitboard.Tables
+    # only set when keys holds the canonical layouts alone
+    mirrors: Optional[np.ndarray]
+    sizes: Optional[np.ndarray]
+
+    def __init__(
+            self,
+            keys: np.ndarray,
+            components: np.ndarray,
+            rows: int=...,
+            cols: int=...,
+            types: Optional[Tuple[int, ...]]=None,
+            mirrors: Optional[np.ndarray]=None,
+            sizes: Optional[np.ndarray]=None
+    ) -> None: ...
+    @staticmethod
+    def path_for(counts: Dict[int, int], directory: Path=...) -> Path: ...
+    @staticmethod
+    def build(counts: Dict[int, int], rows: int=..., cols: int=..., canonical: bool=...) -> ReachabilityDB: ...
+    @staticmethod
+    def load(
+            path: Union[Path, str],
+            rows: int=...,
+            cols: int=...,
+            types: Optional[Tuple[int, ...]]=None
+    ) -> ReachabilityDB: ...
+    def save(self, path: Union[Path, str]) -> None: ...
+    def __len__(self) -> int: ...
+    def component(self, board: solver.Board) -> Optional[int]: ...
+    def reachable(self, start: solver.Board, goal: solver.Board) -> bool: ...
+    def component_sizes(self) -> np.ndarray: ...
+    def random_in(self, component: int) -> np.ndarray: ...
+
+
+def main() -> None: ...
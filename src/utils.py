@@ -4,6 +4,7 @@ import src.colors as colors
 
 from typing import *
 import pygame
+import collections
 import math
 import sys
 
@@ -19,6 +20,57 @@ MIDBOTTOM = "midbottom"
 MIDRIGHT = "midright"
 
 
+class SurfaceCache:
+    """
+    keeps the most recently used surfaces up to maxsize, the least recently used one
+    is dropped when a new one does not fit
+    """
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize: int = maxsize
+        self._surfaces: "collections.OrderedDict[Hashable, pygame.surface.Surface]" = collections.OrderedDict()
+
+    def get(self, key: Hashable, build: Callable[[], pygame.surface.Surface]) -> pygame.surface.Surface:
+        """
+        :param key: what the surface is made from
+        :param build: makes the surface when it is not cached
+        :return: pygame.surface.Surface
+        """
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = build()
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.maxsize:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+
+# text rendered with the fonts from cfg.get_font, which are never freed so the same font is always the same key
+__cached_texts: SurfaceCache = SurfaceCache(256)
+
+
+def render_text(font: pygame.font.Font, text: str, antialias: bool=True, color: Tuple[int, ...]=colors.black) -> pygame.surface.Surface:
+    """
+    font.render but only the first time the same text is asked for, the surface is shared so it must not be drawn on
+    :param font: pygame.font.Font
+    :param text: str
+    :param antialias: bool
+    :param color: Tuple[int, ...]
+    :return: pygame.surface.Surface
+    """
+    return __cached_texts.get(
+        (font, text, antialias, tuple(color)),
+        lambda: font.render(text, antialias, color),
+    )
+
+
 def load_image(path: Union[Path, str]) -> pygame.surface.Surface:
     return pygame.image.load(path).convert()
 
@@ -45,6 +97,18 @@ def resize_by_x(image: pygame.surface.Surface, amount: Union[int, float]) -> pyg
     return pygame.transform.scale(image, (w*amount, h*amount))
 
 
+def draw_board(rows: int, cols: int, cell_size: int, line_color: Tuple[int, int, int], cell_color: Tuple[int, int, int]) -> pygame.surface.Surface:
+    """
+    an empty board like the ones in the assets, cells with a 1px line around every one
+    """
+    surface = pygame.Surface((cols * cell_size + cols + 1, rows * cell_size + rows + 1))
+    surface.fill(line_color)
+    for row in range(rows):
+        for col in range(cols):
+            pygame.draw.rect(surface, cell_color, (1 + col * (cell_size + 1), 1 + row * (cell_size + 1), cell_size, cell_size))
+    return surface
+
+
 def get_font(size, type_of_font="comicsans") -> pygame.font.Font:
     """
     it send a font back with the font type and the font size given
@@ -67,13 +131,14 @@ def get_font(size, type_of_font="comicsans") -> pygame.font.Font:
 def wrap_multi_lines(text: str, font: pygame.font.Font, max_width: int, max_height: int=0, antialias: bool=True) -> List[str]:
     finished_lines = [""]
 
+    # only the sizes are needed so nothing has to be rendered
     for word in text.split(" "):
-        w = font.render(word, antialias, colors.black).get_width()
+        w = font.size(word)[0]
         # check if one word is too long to fit in one line
         if w > max_width:
             sys.exit(f"""the word: "{word}" is too long to fit in a width of: {max_width}, out of bounds by: {w - max_width}pxls""")
 
-        if font.render(finished_lines[-1] + word, antialias, colors.black).get_width() > max_width:
+        if font.size(finished_lines[-1] + word)[0] > max_width:
             finished_lines.append(f"""{word}""")
         else:
             finished_lines[-1] += f""" {word}"""
@@ -81,7 +146,7 @@ def wrap_multi_lines(text: str, font: pygame.font.Font, max_width: int, max_heig
     if max_height > 0:
         h = 0
         for line in finished_lines:
-            h += font.render(line, antialias, colors.black).get_height()
+            h += font.size(line)[1]
 
         if h > max_height:
             sys.exit(f"""the lines: {finished_lines} are too long in the y axis by: {h - max_height}pxls""")
@@ -106,7 +171,7 @@ def blit_multiple_lines(x: int, y: int, lines: list, WIN: pygame.surface.Surface
         sys.exit("Missing 'centered_x_pos'")
     height = font.get_height()
     for i, text in enumerate(lines):
-        rendered_text_surface = font.render(text, True, color)
+        rendered_text_surface = render_text(font, text, True, color)
 
         if centered_x:
             WIN.blit(rendered_text_surface, (centered_x_pos - rendered_text_surface.get_width()/2, y + (i * height)))
@@ -1,15 +1,28 @@
-from typing import Tuple, Union, List
+from typing import Tuple, Union, List, Hashable, Callable
 
 from pathlib import Path
 
 import pygame
 
+class SurfaceCache:
+    maxsize: int
+
+    def __init__(self, maxsize: int) -> None: ...
+    # build makes the surface when key is not cached
+    def get(self, key: Hashable, build: Callable[[], pygame.surface.Surface]) -> pygame.surface.Surface: ...
+    def clear(self) -> None: ...
+    def __len__(self) -> int: ...
+
+# font.render cached by (font, text, antialias, color), the surface is shared so it must not be drawn on
+def render_text(font: pygame.font.Font, text: str, antialias: bool=True, color: Tuple[int, ...]=...) -> pygame.surface.Surface: ...
 def load_image(path: Union[Path, str]) -> pygame.surface.Surface: ...
 def load_alpha_image(path: Union[Path, str]) -> pygame.surface.Surface: ...
 def resize_smooth_image(image: pygame.Surface, new_size: Tuple[int, int]) -> pygame.surface.Surface: ...
 def resize_image(image: pygame.Surface, new_size: Tuple[int, int]) -> pygame.surface.Surface: ...
 def resize_image_ratio(image: pygame.Surface, new_size: Tuple[int, int]) -> pygame.surface.Surface: ...
 def resize_by_x(image: pygame.surface.Surface, amount: Union[int, float]) -> pygame.surface.Surface: ...
+# an empty board like the ones in the assets
+def draw_board(rows: int, cols: int, cell_size: int, line_color: Tuple[int, int, int], cell_color: Tuple[int, int, int]) -> pygame.surface.Surface: ...
 def get_font(size, type_of_font="comicsans") -> pygame.font.Font: ...
 def wrap_multi_lines(
         text: str,
@@ -0,0 +1,37 @@
+import src.bitboard as bitboard
+import src.grid as grid
+
+import pytest
+
+
+def layout_counts(tables: bitboard.Tables, state: int) -> dict:
+    return {typ: bin(tables.anchors(state, typ)).count("1") for typ in tables.types}
+
+
+def test_random_layout_fills_the_whole_board():
+    tables = bitboard.get_tables(5, 4, grid.Blocks.CLASSIC)
+    for _ in range(100):
+        state, _ = tables.random_layout({grid.Blocks.BLOCK_2x1: 10})
+        assert state & tables.full == tables.full
+        assert layout_counts(tables, state)[grid.Blocks.BLOCK_2x1] == 10
+
+
+def test_random_layout_places_every_block():
+    tables = bitboard.get_tables(5, 4, grid.Blocks.CLASSIC)
+    counts = {grid.Blocks.BLOCK_2x2: 1, grid.Blocks.BLOCK_2x1: 2, grid.Blocks.BLOCK_1x2: 2, grid.Blocks.BLOCK_1x1: 2}
+    for _ in range(100):
+        state, _ = tables.random_layout(counts)
+        assert layout_counts(tables, state) == {typ: counts.get(typ, 0) for typ in tables.types}
+        assert bin(state & tables.full).count("1") == 14
+
+
+@pytest.mark.parametrize("counts", [
+    # 20 cells but 5 rows of vertical dominoes can not be covered
+    {grid.Blocks.BLOCK_1x2: 10},
+    {grid.Blocks.BLOCK_2x2: 5},
+    {grid.Blocks.BLOCK_1x1: 21},
+])
+def test_random_layout_raises_when_the_blocks_do_not_fit(counts):
+    tables = bitboard.get_tables(5, 4, grid.Blocks.CLASSIC)
+    with pytest.raises(ValueError):
+        tables.random_layout(counts)